@@ -1,11 +1,64 @@
+import concurrent.futures
 import flask
 import json
+import os
+import queue
 
+from src.packages.pyagram import binary_encoding
+from src.packages.pyagram import budget
+from src.packages.pyagram import constants
+from src.packages.pyagram import encode
+from src.packages.pyagram import exception
 from src.packages.pyagram import pyagram as pg
+from src.packages.pyagram import result_cache
+from src.packages.pyagram import session_store
+from src.packages.pyagram import worker_pool
+
+SESSION_STORE = session_store.SessionStore(
+    max_sessions=constants.MAX_SESSIONS,
+    ttl=constants.SESSION_TTL,
+)
+CACHE_DIR = os.environ.get('PYAGRAM_CACHE_DIR')
+RESULT_CACHE = result_cache.ResultCache(
+    max_entries=constants.RESULT_CACHE_SIZE,
+    directory=None if CACHE_DIR is None else os.path.join(CACHE_DIR, 'results'),
+    max_disk_bytes=constants.RESULT_CACHE_MAX_DISK_BYTES,
+)
+SESSION_RESULT_CACHE = result_cache.ResultCache(max_entries=constants.SESSION_RESULT_CACHE_SIZE)
+CODE_CACHE = result_cache.ResultCache(
+    max_entries=constants.CODE_CACHE_SIZE,
+    directory=None if CACHE_DIR is None else os.path.join(CACHE_DIR, 'code'),
+    max_disk_bytes=constants.CODE_CACHE_MAX_DISK_BYTES,
+)
+NUM_WORKERS = int(os.environ.get('PYAGRAM_NUM_WORKERS', '0'))
+WORKER_MODE = os.environ.get('PYAGRAM_WORKER_MODE', constants.POOL_WORKER_MODE)
+WORKER_POOL = None
 
 def render_endpoints(app):
+    start_worker_pool()
     render_root(app)
     render_draw(app)
+    render_snapshots(app)
+    render_cache(app)
+    render_pool(app)
+
+def start_worker_pool():
+
+    # The pool is started here rather than on import, since its worker processes import this module.
+
+    global WORKER_POOL
+    if WORKER_MODE not in {constants.POOL_WORKER_MODE, constants.FORK_WORKER_MODE}:
+        raise ValueError(f'unknown worker mode {WORKER_MODE!r}')
+    if 0 < NUM_WORKERS and WORKER_POOL is None:
+        WORKER_POOL = worker_pool.WorkerPool(
+            run_draw_job,
+            num_workers=NUM_WORKERS,
+            max_queue=constants.WORKER_POOL_MAX_QUEUE,
+            max_jobs_per_worker=constants.WORKER_MAX_JOBS,
+            max_rss_bytes=constants.WORKER_MAX_RSS_BYTES,
+            timeout=constants.WORKER_TIMEOUT,
+            fork_per_job=WORKER_MODE == constants.FORK_WORKER_MODE,
+        )
 
 def render_root(app):
     @app.route('/')
@@ -17,10 +70,174 @@ def render_draw(app):
     @app.route('/draw')
     def draw(methods=['GET', 'POST']):
         code = flask.request.values.get('code')
-        pyagram = pg.Pyagram(code, debug=True) # TODO: Set debug=False.
-        return json.dumps(pyagram.serialize())
+        delta = flask.request.values.get('delta') == 'true'
+        paginate = flask.request.values.get('paginate') == 'true'
+        binary = accepts_binary()
+        if paginate:
+            serialization = draw_serialization(code, delta=False, binary=False, paginate=True)
+            if serialization['encoding'] == 'result':
+                session_id = SESSION_STORE.add(serialization['data'])
+                serialization = {
+                    'encoding': serialization['encoding'],
+                    'data': encode.encode_pyagram_session(
+                        session_id,
+                        serialization['data'],
+                        page_size=constants.SNAPSHOT_PAGE_SIZE,
+                        delta=delta,
+                    ),
+                }
+            return make_response(encode_serialization(serialization, binary), binary)
+        return make_response(draw_serialization(code, delta=delta, binary=binary), binary)
     return draw
 
+def accepts_binary():
+
+    # Content negotiation: only send the binary encoding to clients that ask for it.
+
+    best_mimetype = flask.request.accept_mimetypes.best_match([
+        'application/json',
+        binary_encoding.MIMETYPE,
+    ])
+    return best_mimetype == binary_encoding.MIMETYPE
+
+def encode_serialization(serialization, binary):
+    if binary:
+        return binary_encoding.pack(serialization)
+    else:
+        return json.dumps(serialization).encode()
+
+def make_response(serialization, binary, status=200):
+    return flask.Response(
+        serialization,
+        status=status,
+        mimetype=binary_encoding.MIMETYPE if binary else 'application/json',
+        headers={'Vary': 'Accept'},
+    )
+
+def draw_serialization(code, *, delta, binary, paginate=False):
+
+    # A paginated result is not serialized, since its snapshots are sent a page at a time. It is
+    # kept as it is, in a cache of its own (in memory only), and every session of the same code
+    # shares it.
+
+    cache = SESSION_RESULT_CACHE if paginate else RESULT_CACHE
+    key = cache.make_key(code, delta=delta, binary=binary)
+    serialization = cache.get(key)
+    if serialization is None:
+
+        # The Budget stops the user's code from within the tracer. Code that gets around it (e.g. by
+        # catching the BudgetExceededException with a bare `except:`) can only be stopped by killing
+        # the process it runs in, so that hard limit needs a worker pool. Without one, the job runs in
+        # the web server's own process.
+
+        if WORKER_POOL is None:
+            serialization, is_cacheable = run_draw_job(code, delta, binary, paginate)
+        else:
+            serialization, is_cacheable = run_pool_job(code, delta, binary, paginate)
+        if not is_cacheable:
+            return serialization
+        cache.put(key, serialization)
+    return serialization
+
+def run_draw_job(code, delta, binary, paginate=False):
+
+    # Return the result (serialized, unless it is paginated), and whether it may be cached. A result
+    # that was cut short by the Budget is not, since a rerun may get further (e.g. when the time
+    # limit is what ran out).
+
+    pyagram = make_pyagram(code, delta)
+    serialization = pyagram.serialize()
+    if not paginate:
+        serialization = encode_serialization(serialization, binary)
+    return serialization, pyagram.truncation is None
+
+def make_pyagram(code, delta):
+    return pg.Pyagram(
+        code,
+        debug=True, # TODO: Set debug=False.
+        delta=delta,
+        code_cache=CODE_CACHE,
+        budget=make_budget(),
+    )
+
+def make_budget():
+    return budget.Budget(
+        max_trace_events=constants.MAX_TRACE_EVENTS,
+        max_snapshots=constants.MAX_SNAPSHOTS,
+        max_seconds=constants.MAX_SECONDS,
+        max_heap_bytes=constants.MAX_HEAP_BYTES,
+    )
+
+def run_pool_job(code, delta, binary, paginate):
+
+    # Return the serialized result, and whether it may be cached, as in run_draw_job. If the job does
+    # not finish, the result is an error instead, which is not worth caching since it may not happen
+    # again.
+
+    try:
+        return WORKER_POOL.submit(code, delta, binary, paginate).result()
+    except queue.Full:
+        error_message = constants.WORKER_POOL_BUSY_MSG
+    except concurrent.futures.TimeoutError:
+        error_message = constants.WORKER_TIMEOUT_MSG
+    except worker_pool.WorkerError:
+        error_message = constants.GENERIC_ERROR_MSG
+    if paginate:
+        return make_error(error_message), False
+    else:
+        return encode_error(error_message, binary), False
+
+def make_error(error_message):
+    pyagram_error = exception.PyagramError(error_message)
+    return {
+        'encoding': 'error',
+        'data': encode.encode_pyagram_error(pyagram_error),
+    }
+
+def encode_error(error_message, binary):
+    return encode_serialization(make_error(error_message), binary)
+
+def render_snapshots(app):
+    @app.route('/snapshots')
+    def snapshots(methods=['GET']):
+        session_id = flask.request.values.get('session_id')
+        start = flask.request.values.get('start', type=int, default=0)
+        stop = flask.request.values.get('stop', type=int, default=start + constants.SNAPSHOT_PAGE_SIZE)
+        delta = flask.request.values.get('delta') == 'true'
+        binary = accepts_binary()
+        result = SESSION_STORE.get(session_id)
+        if result is None:
+            return make_error_response(constants.SESSION_EXPIRED_MSG, binary, status=404)
+
+        # The last page may run past the last snapshot, so the stop index gets clamped. Any other
+        # range is rejected, rather than sliced the way Python would slice it.
+
+        stop = min(stop, len(result['snapshots']))
+        if not 0 <= start <= stop or constants.SNAPSHOT_PAGE_SIZE < stop - start:
+            return make_error_response(constants.INVALID_PAGE_MSG, binary, status=400)
+        page = encode.encode_pyagram_page(result, start, stop, delta=delta)
+        return make_response(encode_serialization(page, binary), binary)
+    return snapshots
+
+def make_error_response(error_message, binary, *, status):
+    return make_response(encode_error(error_message, binary), binary, status=status)
+
+def render_cache(app):
+    @app.route('/cache')
+    def cache(methods=['GET']):
+        return json.dumps({
+            'results': RESULT_CACHE.stats(),
+            'session_results': SESSION_RESULT_CACHE.stats(),
+            'code': CODE_CACHE.stats(),
+        })
+    return cache
+
+def render_pool(app):
+    @app.route('/pool')
+    def pool(methods=['GET']):
+        return json.dumps(None if WORKER_POOL is None else WORKER_POOL.stats())
+    return pool
+
 if __name__ == '__main__':
     app = flask.Flask(__name__)
     render_endpoints(app)
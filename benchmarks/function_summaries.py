@@ -0,0 +1,82 @@
+import inspect
+import os
+import sys
+import unittest.mock
+
+from benchmarks import worker_modes
+from src.packages.pyagram import pyagram as pg
+from src.packages.pyagram import pyagram_state
+from src.packages.pyagram import utils
+
+# Compare drawing a pyagram with MemoryState.get_function_summary caching each function's summary
+# (its signature, defaults, and whether it is a generator function or user-defined), against
+# summarizing the function anew every time, the way it was before the cache. Also count the calls
+# to inspect.signature. Run this from the root of the repository:
+#
+#     python -m benchmarks.function_summaries [PATH_TO_CODE ...] [NUM_REPEATS]
+
+PROGRAMS = {
+    'fib(9)': '''
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib(9))
+''',
+    'deep recursion': '''
+def total(items):
+    if not items:
+        return 0
+    first, *rest = items
+    return first + total(rest)
+print(total(list(range(60))))
+''',
+    'closures': '''
+def make_adder(n, *, scale=1):
+    def add(x, y=0):
+        return scale * (x + y) + n
+    return add
+adders = [make_adder(i, scale=2) for i in range(4)]
+print([adder(10, y=i) for i, adder in enumerate(adders)])
+''',
+}
+
+def count_signatures(code):
+    """
+    """
+    with unittest.mock.patch.object(inspect, 'signature', wraps=inspect.signature) as signature:
+        pg.Pyagram(code, debug=False)
+    return signature.call_count
+
+def main(programs, num_repeats):
+    """
+    """
+    uncached = unittest.mock.patch.object(
+        pyagram_state.MemoryState,
+        'get_function_summary',
+        lambda self, function: utils.summarize_function(function),
+    )
+    for name, code in programs.items():
+        cached_time = worker_modes.time_job(lambda: pg.Pyagram(code, debug=False), num_repeats)
+        cached_signatures = count_signatures(code)
+        with uncached:
+            uncached_time = worker_modes.time_job(lambda: pg.Pyagram(code, debug=False), num_repeats)
+            uncached_signatures = count_signatures(code)
+        print(
+            f'{name:<20}'
+            f'uncached {uncached_time * 1000:.0f}ms, {uncached_signatures} signatures    '
+            f'cached {cached_time * 1000:.0f}ms, {cached_signatures} signatures    '
+            f'(median of {num_repeats})'
+        )
+
+if __name__ == '__main__':
+    programs = PROGRAMS
+    num_repeats = 5
+    if 1 < len(sys.argv) and sys.argv[-1].isdigit():
+        num_repeats = int(sys.argv.pop())
+    if 1 < len(sys.argv):
+        programs = {}
+        for path in sys.argv[1:]:
+            with open(path) as file:
+                programs[os.path.basename(path)] = file.read()
+    main(programs, num_repeats)
@@ -0,0 +1,116 @@
+import gc
+import importlib
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+import unittest.mock
+
+# Measure how long a pyagram takes to trace and to draw, the peak memory it takes, and the size of
+# each of its frames and flags (with their __dict__, if they have one). It only uses what has not
+# changed since before the elements and states had __slots__, so it can compare the two: check out
+# each commit in its own worktree, and pass that as the repository to draw with. Run this from the
+# root of the repository:
+#
+#     python -m benchmarks.slots [REPOSITORY] [NUM_REPEATS]
+#
+# For instance:
+#
+#     git worktree add /tmp/pyagram-before <commit before the __slots__ change>
+#     python -m benchmarks.slots /tmp/pyagram-before
+#     python -m benchmarks.slots .
+
+PROGRAMS = {
+    'fib(9)': '''
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib(9))
+''',
+    'deep recursion': '''
+def total(items):
+    if not items:
+        return 0
+    first, *rest = items
+    return first + total(rest)
+print(total(list(range(60))))
+''',
+}
+
+def import_pyagram(repository):
+    """
+    """
+    sys.path.insert(0, os.path.abspath(repository))
+    return (
+        importlib.import_module('src.packages.pyagram.pyagram'),
+        importlib.import_module('src.packages.pyagram.pyagram_element'),
+        importlib.import_module('src.packages.pyagram.trace'),
+    )
+
+def draw(code, pyagram, pyagram_element, trace):
+    """
+    """
+
+    # Return how long the pyagram took to trace and to draw, and the sizes of its elements. Those
+    # are measured right after tracing, while the elements are still alive.
+
+    run_tracer = trace.Tracer.run
+    tracing_times = []
+    element_sizes = []
+
+    def run(self, *args, **kwargs):
+        start_time = time.perf_counter()
+        try:
+            return run_tracer(self, *args, **kwargs)
+        finally:
+            tracing_times.append(time.perf_counter() - start_time)
+            element_sizes.extend(
+                sys.getsizeof(element)
+                + (sys.getsizeof(element.__dict__) if hasattr(element, '__dict__') else 0)
+                for element in gc.get_objects()
+                if isinstance(element, pyagram_element.PyagramElement)
+            )
+
+    with unittest.mock.patch.object(trace.Tracer, 'run', run):
+        start_time = time.perf_counter()
+        pyagram.Pyagram(code, debug=False)
+        total_time = time.perf_counter() - start_time
+    return sum(tracing_times), total_time, statistics.median(element_sizes)
+
+def get_peak_memory(code, pyagram):
+    """
+    """
+    tracemalloc.start()
+    try:
+        pyagram.Pyagram(code, debug=False)
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak_memory
+
+def main(repository, num_repeats):
+    """
+    """
+    pyagram, pyagram_element, trace = import_pyagram(repository)
+    for name, code in PROGRAMS.items():
+        runs = [draw(code, pyagram, pyagram_element, trace) for _ in range(num_repeats)]
+        tracing_time = min(tracing_time for tracing_time, _, _ in runs)
+        total_time = min(total_time for _, total_time, _ in runs)
+        element_size = runs[0][2]
+        peak_memory = get_peak_memory(code, pyagram)
+        print(
+            f'{name:<16}'
+            f'tracing {tracing_time * 1000:.0f}ms    '
+            f'total {total_time * 1000:.0f}ms    '
+            f'element size {element_size:.0f}B    '
+            f'peak {peak_memory / 2 ** 20:.1f}MB    '
+            f'(best of {num_repeats})'
+        )
+
+if __name__ == '__main__':
+    main(
+        sys.argv[1] if 1 < len(sys.argv) else '.',
+        int(sys.argv[2]) if 2 < len(sys.argv) else 3,
+    )
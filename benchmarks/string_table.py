@@ -0,0 +1,80 @@
+import gzip
+import os
+import sys
+import unittest.mock
+
+import app
+from src.packages.pyagram import encode
+from src.packages.pyagram import pyagram as pg
+
+# Compare the size of a pyagram's result with names, variable names and banner code interned into
+# its string table, against the same result with every string inline. The latter is what the result
+# looked like before the string table; the benchmark gets it by making Encoder.intern_string return
+# each string as it is. Run this from the root of the repository:
+#
+#     python -m benchmarks.string_table [PATH_TO_CODE ...]
+
+PROGRAMS = {
+    'fib(9)': '''
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib(9))
+''',
+    'deep recursion': '''
+def total(items):
+    if not items:
+        return 0
+    first, *rest = items
+    return first + total(rest)
+print(total(list(range(60))))
+''',
+    'mutual recursion': '''
+def is_even(n):
+    return True if n == 0 else is_odd(n - 1)
+def is_odd(n):
+    return False if n == 0 else is_even(n - 1)
+print([is_even(n) for n in range(12)])
+''',
+}
+
+def get_sizes(code, *, delta):
+    """
+    """
+    serialization = pg.Pyagram(code, debug=False, delta=delta).serialize()
+    assert serialization['encoding'] == 'result'
+    sizes = []
+    for binary in [False, True]:
+        encoding = app.encode_serialization(serialization, binary)
+        sizes.extend([len(encoding), len(gzip.compress(encoding))])
+    return sizes
+
+def main(programs):
+    """
+    """
+    print(f'{"":<40}{"json":>12}{"gzipped":>10}{"binary":>12}{"gzipped":>10}')
+    for name, code in programs.items():
+        for delta in [False, True]:
+            with unittest.mock.patch.object(
+                encode.Encoder,
+                'intern_string',
+                lambda self, string: string,
+            ):
+                inline_sizes = get_sizes(code, delta=delta)
+            table_sizes = get_sizes(code, delta=delta)
+            for label, sizes in [('inline', inline_sizes), ('string table', table_sizes)]:
+                label = f'{name}{", delta" if delta else ""} ({label})'
+                print(f'{label:<40}' + ''.join(
+                    f'{size:>{width},}'
+                    for size, width in zip(sizes, [12, 10, 12, 10])
+                ))
+
+if __name__ == '__main__':
+    programs = PROGRAMS
+    if 1 < len(sys.argv):
+        programs = {}
+        for path in sys.argv[1:]:
+            with open(path) as file:
+                programs[os.path.basename(path)] = file.read()
+    main(programs)
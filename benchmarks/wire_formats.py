@@ -0,0 +1,47 @@
+import gzip
+import sys
+
+import app
+from benchmarks import worker_modes
+from src.packages.pyagram import pyagram as pg
+
+# Compare the sizes of a pyagram's result in each of the formats /draw can send it in (JSON or the
+# binary encoding, each with and without delta encoding), and the time it takes to encode it. The
+# pyagram is drawn once per setting of delta, and only its encoding is timed. Run this from the
+# root of the repository:
+#
+#     python -m benchmarks.wire_formats [PATH_TO_CODE] [NUM_REPEATS]
+
+PROGRAM = '''
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+print(fib(9))
+'''
+
+def main(code, num_repeats):
+    """
+    """
+    for delta in [False, True]:
+        serialization = pg.Pyagram(code, debug=False, delta=delta).serialize()
+        for binary in [False, True]:
+            encoding = app.encode_serialization(serialization, binary)
+            median_time = worker_modes.time_job(
+                lambda: app.encode_serialization(serialization, binary),
+                num_repeats,
+            )
+            wire_format = ('binary' if binary else 'json') + (' + delta' if delta else '')
+            print(
+                f'{wire_format:<16}'
+                f'{len(encoding):>12,} bytes'
+                f'{len(gzip.compress(encoding)):>12,} gzipped'
+                f'    median of {num_repeats}: {median_time * 1000:.1f}ms'
+            )
+
+if __name__ == '__main__':
+    code = PROGRAM
+    if 1 < len(sys.argv):
+        with open(sys.argv[1]) as file:
+            code = file.read()
+    main(code, int(sys.argv[2]) if 2 < len(sys.argv) else 20)
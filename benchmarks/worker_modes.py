@@ -0,0 +1,92 @@
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+import app
+from src.packages.pyagram import worker_pool
+
+# Compare the ways a /draw job can run: in the web server's own process, in a reused pool worker, in
+# a child forked from the zygote for each job, and in a cold `python -c` subprocess. Run this from
+# the root of the repository:
+#
+#     python -m benchmarks.worker_modes [PATH_TO_CODE] [NUM_REPEATS]
+
+PROGRAM = '''
+def fact(n):
+    if n == 0:
+        return 1
+    return n * fact(n - 1)
+print(fact(5))
+'''
+
+COLD_COMMAND = '''
+import json, sys
+from src.packages.pyagram import pyagram as pg
+sys.stdout.write(json.dumps(pg.Pyagram(sys.stdin.read(), debug=False).serialize()))
+'''
+
+def time_job(run_job, num_repeats):
+    """
+    """
+
+    # The first run is a warm-up, which is left out of the median.
+
+    run_job()
+    times = []
+    for _ in range(num_repeats):
+        start_time = time.perf_counter()
+        run_job()
+        times.append(time.perf_counter() - start_time)
+    return statistics.median(times)
+
+def time_pool(code, num_repeats, *, fork_per_job):
+    """
+    """
+    pool = worker_pool.WorkerPool(
+        app.run_draw_job,
+        num_workers=1,
+        max_queue=1,
+        max_jobs_per_worker=num_repeats + 1,
+        max_rss_bytes=float('inf'),
+        timeout=60,
+        fork_per_job=fork_per_job,
+    )
+    try:
+        return time_job(lambda: pool.submit(code, False, False).result(), num_repeats)
+    finally:
+        pool.shutdown()
+
+def time_cold_subprocess(code, num_repeats):
+    """
+    """
+    return time_job(
+        lambda: subprocess.run(
+            [sys.executable, '-c', COLD_COMMAND],
+            input=code.encode(),
+            stdout=subprocess.DEVNULL,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(app.__file__)),
+        ),
+        num_repeats,
+    )
+
+def main(code, num_repeats):
+    """
+    """
+    median_times = {
+        'in-process': time_job(lambda: app.run_draw_job(code, False, False), num_repeats),
+        'pool worker': time_pool(code, num_repeats, fork_per_job=False),
+        'fork per job': time_pool(code, num_repeats, fork_per_job=True),
+        'cold python -c': time_cold_subprocess(code, num_repeats),
+    }
+    for mode, median_time in median_times.items():
+        print(f'{mode:<16} median of {num_repeats}: {median_time * 1000:.1f}ms')
+
+if __name__ == '__main__':
+    code = PROGRAM
+    if 1 < len(sys.argv):
+        with open(sys.argv[1]) as file:
+            code = file.read()
+    main(code, int(sys.argv[2]) if 2 < len(sys.argv) else 20)
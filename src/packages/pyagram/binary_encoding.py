@@ -0,0 +1,196 @@
+import struct
+
+MIMETYPE = 'application/x-msgpack'
+
+SHAPE_REFERENCE_EXT = 1
+SHAPE_DEFINITION_EXT = 2
+MAX_SHAPES = 2 ** 16
+
+CONTAINER_END = object()
+
+class Packer:
+    """
+    """
+
+    # Pack JSON-like values (None, bools, ints, floats, strings, lists, tuples and dicts) into the
+    # MessagePack format, which src/scripts/binary.js unpacks. The one extension is for dicts: the
+    # first dict with a given sequence of keys defines a shape, with its own index, and every dict
+    # with that shape is then packed as the shape's index followed by its values in order. This way
+    # keys like 'is_curr_element' are only sent once per result, rather than once per frame.
+    #
+    # Consecutive snapshots share the encodings of unchanged elements, so the bytes for each list
+    # and dict are memoized by ID, and a shared one is only packed once. A shape definition gets
+    # repeated if it is part of such bytes, but it always defines the same index, so this is safe.
+
+    def __init__(self):
+        self.shapes = {}
+        self.packings = {}
+        self.str_packings = {}
+
+    def pack(self, value):
+        """
+        """
+
+        # Results nest as deep as the user's code recurses, which can be deeper than Python's own
+        # recursion limit allows for one call per level. So the values left to pack are kept on a
+        # stack instead. The contents of each container are followed by CONTAINER_END, upon which
+        # the container is taken off the stack of open containers, and its packing memoized.
+        #
+        # The buffer only ever grows, so a container's bytes stay where they were first packed.
+
+        buffer = bytearray()
+        stack = [value]
+        open_containers = []
+        packings = self.packings
+        str_packings = self.str_packings
+        while stack:
+            value = stack.pop()
+            value_type = type(value)
+            if value_type is str:
+                packing = str_packings.get(value)
+                if packing is None:
+                    self.pack_str(value, buffer)
+                else:
+                    buffer += packing
+            elif value_type is dict or value_type is list or value_type is tuple:
+                packing = packings.get(id(value))
+                if packing is None:
+                    open_containers.append((value, len(buffer)))
+                    stack.append(CONTAINER_END)
+                    if value_type is dict:
+                        stack.extend(reversed(self.pack_dict(value, buffer)))
+                    else:
+                        self.pack_header(len(value), buffer, 0x90, 0xdc, 0xdd)
+                        stack.extend(reversed(value))
+                else:
+                    _, start, stop = packing
+                    buffer += buffer[start:stop]
+            elif value is CONTAINER_END:
+                container, start = open_containers.pop()
+                packings[id(container)] = (container, start, len(buffer))
+            elif value_type is int:
+                if 0 <= value < 0x80:
+                    buffer.append(value)
+                else:
+                    self.pack_int(value, buffer)
+            elif value is None:
+                buffer.append(0xc0)
+            elif value is False:
+                buffer.append(0xc2)
+            elif value is True:
+                buffer.append(0xc3)
+            elif value_type is float:
+                buffer.append(0xcb)
+                buffer += struct.pack('>d', value)
+            else:
+                raise TypeError(f'cannot pack an object of type {value_type.__name__}')
+        packings.clear()
+        return bytes(buffer)
+
+    def pack_dict(self, mapping, buffer):
+        """
+        """
+
+        # Pack the dict's header, and return the values that follow it.
+
+        keys = tuple(mapping)
+        shape_index = self.shapes.get(keys)
+        if shape_index is None and len(self.shapes) < MAX_SHAPES and all(type(key) is str for key in keys):
+            shape_index = len(self.shapes)
+            self.shapes[keys] = shape_index
+            buffer.append(0xd5)
+            buffer.append(SHAPE_DEFINITION_EXT)
+            buffer += struct.pack('>H', shape_index)
+            self.pack_header(len(keys), buffer, 0x90, 0xdc, 0xdd)
+            for key in keys:
+                self.pack_str(key, buffer)
+        elif shape_index is not None:
+            if shape_index < 0x100:
+                buffer.append(0xd4)
+                buffer.append(SHAPE_REFERENCE_EXT)
+                buffer.append(shape_index)
+            else:
+                buffer.append(0xd5)
+                buffer.append(SHAPE_REFERENCE_EXT)
+                buffer += struct.pack('>H', shape_index)
+        else:
+            self.pack_header(len(mapping), buffer, 0x80, 0xde, 0xdf)
+            return [item for key_and_value in mapping.items() for item in key_and_value]
+        return mapping.values()
+
+    def pack_str(self, string, buffer):
+        """
+        """
+
+        # The same names and values come up again and again, so their bytes are memoized too.
+
+        packing = self.str_packings.get(string)
+        if packing is None:
+            data = string.encode('utf-8', 'surrogatepass')
+            packing = bytearray()
+            length = len(data)
+            if length < 0x20:
+                packing.append(0xa0 | length)
+            elif length < 0x100:
+                packing.append(0xd9)
+                packing.append(length)
+            else:
+                self.pack_header(length, packing, None, 0xda, 0xdb)
+            packing += data
+            if length < 0x100:
+                self.str_packings[string] = packing
+        buffer += packing
+
+    def pack_int(self, integer, buffer):
+        """
+        """
+
+        # Every integer takes the smallest form that fits it, as the msgpack spec requires.
+
+        if 0 <= integer < 0x80:
+            buffer.append(integer)
+        elif -0x20 <= integer < 0:
+            buffer.append(integer & 0xff)
+        elif 0 <= integer < 2 ** 8:
+            buffer.append(0xcc)
+            buffer.append(integer)
+        elif 0 <= integer < 2 ** 16:
+            buffer.append(0xcd)
+            buffer += struct.pack('>H', integer)
+        elif 0 <= integer < 2 ** 32:
+            buffer.append(0xce)
+            buffer += struct.pack('>I', integer)
+        elif 0 <= integer < 2 ** 64:
+            buffer.append(0xcf)
+            buffer += struct.pack('>Q', integer)
+        elif -2 ** 7 <= integer < 0:
+            buffer.append(0xd0)
+            buffer += struct.pack('>b', integer)
+        elif -2 ** 15 <= integer < 0:
+            buffer.append(0xd1)
+            buffer += struct.pack('>h', integer)
+        elif -2 ** 31 <= integer < 0:
+            buffer.append(0xd2)
+            buffer += struct.pack('>i', integer)
+        elif -2 ** 63 <= integer < 0:
+            buffer.append(0xd3)
+            buffer += struct.pack('>q', integer)
+        else:
+            raise OverflowError(f'cannot pack the integer {integer}')
+
+    def pack_header(self, length, buffer, fix_code, code_16, code_32):
+        """
+        """
+        if fix_code is not None and length < 0x10:
+            buffer.append(fix_code | length)
+        elif length < 0x10000:
+            buffer.append(code_16)
+            buffer += struct.pack('>H', length)
+        else:
+            buffer.append(code_32)
+            buffer += struct.pack('>I', length)
+
+def pack(value):
+    """
+    """
+    return Packer().pack(value)
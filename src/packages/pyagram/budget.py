@@ -0,0 +1,47 @@
+import time
+
+from . import constants
+
+class Budget:
+    """
+    """
+
+    # Limits on how much work may go into drawing a pyagram. A limit of None is no limit. The clock
+    # starts when the Pyagram is constructed, and keeps running if the code has to be re-run.
+
+    def __init__(
+        self,
+        *,
+        max_trace_events=None,
+        max_snapshots=None,
+        max_seconds=None,
+        max_heap_bytes=None,
+    ):
+        self.max_trace_events = max_trace_events
+        self.max_snapshots = max_snapshots
+        self.max_seconds = max_seconds
+        self.max_heap_bytes = max_heap_bytes
+        self.deadline = None
+
+    def start(self):
+        """
+        """
+        if self.max_seconds is not None:
+            self.deadline = time.monotonic() + self.max_seconds
+
+    def check(self, state):
+        """
+        """
+
+        # Return a message explaining which limit the state has exceeded, or None if it has not
+        # exceeded any of them.
+
+        if self.max_trace_events is not None and self.max_trace_events < state.num_trace_events:
+            return constants.TRACE_EVENT_LIMIT_MSG
+        if self.max_snapshots is not None and self.max_snapshots < len(state.snapshots):
+            return constants.SNAPSHOT_LIMIT_MSG
+        if self.deadline is not None and self.deadline < time.monotonic():
+            return constants.TIME_LIMIT_MSG
+        if self.max_heap_bytes is not None and self.max_heap_bytes < state.memory_state.heap_bytes:
+            return constants.HEAP_LIMIT_MSG
+        return None
@@ -1,3 +1,4 @@
+import collections
 import types
 
 USERCODE_FILENAME = 'main.py'
@@ -16,6 +17,37 @@ PG_WRAPPER_LINENO = 5
 CLASS_DEFN_LINENO = 6
 CNTNR_COMP_LINENO = 7
 
+SESSION_EXPIRED_MSG = 'This pyagram has expired. Please draw it again.'
+INVALID_PAGE_MSG = 'The requested snapshots are out of range.'
+WORKER_POOL_BUSY_MSG = 'The server is busy. Please try again in a moment.'
+WORKER_TIMEOUT_MSG = 'Your code took too long to run.'
+TRACE_EVENT_LIMIT_MSG = 'Your code took too many steps, so only the first part of it is drawn.'
+SNAPSHOT_LIMIT_MSG = 'The pyagram has too many steps, so only the first part of it is drawn.'
+TIME_LIMIT_MSG = 'Your code took too long to run, so only the first part of it is drawn.'
+HEAP_LIMIT_MSG = 'Your code used too much memory, so only the first part of it is drawn.'
+
+SNAPSHOT_PAGE_SIZE = 32
+MAX_SESSIONS = 64
+SESSION_TTL = 30 * 60 # In seconds.
+
+RESULT_CACHE_SIZE = 256
+SESSION_RESULT_CACHE_SIZE = 64
+RESULT_CACHE_MAX_DISK_BYTES = 256 * 2 ** 20
+CODE_CACHE_SIZE = 256
+CODE_CACHE_MAX_DISK_BYTES = 64 * 2 ** 20
+
+WORKER_POOL_MAX_QUEUE = 32
+WORKER_MAX_JOBS = 100
+WORKER_MAX_RSS_BYTES = 512 * 2 ** 20
+WORKER_TIMEOUT = 30 # In seconds.
+POOL_WORKER_MODE = 'pool'
+FORK_WORKER_MODE = 'fork'
+
+MAX_TRACE_EVENTS = 500000
+MAX_SNAPSHOTS = 10000
+MAX_SECONDS = 10
+MAX_HEAP_BYTES = 64 * 2 ** 20
+
 NORMAL_ARG = 0
 SINGLY_UNPACKED_ARG = 1
 DOUBLY_UNPACKED_ARG = 2
@@ -46,6 +78,7 @@ ORDERED_COLLECTION_TYPES = {
     list,
     tuple,
     str,
+    collections.deque,
 }
 UNORDERED_COLLECTION_TYPES = {
     set,
@@ -53,6 +86,8 @@ UNORDERED_COLLECTION_TYPES = {
 }
 MAPPING_TYPES = {
     dict,
+    collections.OrderedDict,
+    collections.defaultdict,
 }
 ITERATOR_TYPES = {
     # TODO: Does this have to be a dict, or can it be a set? I don't think you use the values in JS.
@@ -65,6 +100,7 @@ ITERATOR_TYPES = {
     type(iter({}.keys())): dict,
     type(iter({}.values())): dict,
     type(iter({}.items())): dict,
+    type(iter(collections.deque())): collections.deque,
 }
 ITERATOR_ANNOTATIONS = {
     type(iter({}.keys())): 'keys',
@@ -75,11 +111,9 @@ GENERATOR_TYPES = {
     types.GeneratorType,
 }
 # TODO: Finish the above. Here are some ideas, but note they are not comprehensive ...
-# TODO:     odict, odict_keys, ordereddict, etc.
+# TODO:     odict_keys, odict_iterator, etc. (These have no __length_hint__.)
 # TODO:     types.MappingProxyType
-# TODO:     OrderedDict
 # TODO:     Counter
-# TODO:     What about namedtuple classes / instances?
 # TODO:     collections.*
 # TODO:     map (the output of a call to `map`)
 # TODO:     range
@@ -2,6 +2,7 @@ import inspect
 
 from . import constants
 from . import enum
+from . import object_registry
 from . import pyagram_element
 from . import pyagram_wrapped_object
 from . import utils
@@ -15,6 +16,28 @@ class Encoder:
         num_lines, lambdas_per_line = preprocessor_summary
         self.num_lines = num_lines
         self.lambdas_per_line = lambdas_per_line
+        self.element_encodings = {}
+        self.curr_element = None
+        self.hiding_flags = []
+        self.strings = []
+        self.string_indices = {}
+
+    def intern_string(self, string):
+        """
+        """
+
+        # Names, variable names and banner code come up in snapshot after snapshot, so each distinct
+        # string is only stored once, in a table that is sent with the result. Snapshots refer to a
+        # string by its index in the table, which src/scripts/decode.js resolves.
+
+        if string is None:
+            return None
+        index = self.string_indices.get(string)
+        if index is None:
+            index = len(self.strings)
+            self.strings.append(string)
+            self.string_indices[string] = index
+        return index
 
     def object_id(self, object):
         """
@@ -27,9 +50,39 @@ class Encoder:
             proxy_id = self.state.memory_state.wrapped_obj_ids[proxy_id]
         return proxy_id
 
+    def update_dirty_elements(self):
+        """
+        """
+
+        # Mark the elements whose encodings have changed for reasons other than a change to the
+        # elements themselves: those that have just stopped or started being the current element, and
+        # those that were hidden from a snapshot index that has only just been reached.
+
+        curr_element = self.state.program_state.curr_element
+        if curr_element is not self.curr_element:
+            if self.curr_element is not None:
+                self.curr_element.mark_dirty()
+            if curr_element is not None:
+                curr_element.mark_dirty()
+            self.curr_element = curr_element
+        hiding_flags = []
+        for pyagram_flag in self.hiding_flags:
+            if pyagram_flag.is_hidden():
+                pyagram_flag.mark_dirty()
+            else:
+                hiding_flags.append(pyagram_flag)
+        self.hiding_flags = hiding_flags
+
+    def clear_element_encodings(self):
+        """
+        """
+        self.element_encodings.clear()
+
     def encode_pyagram_flag(self, pyagram_flag):
         """
         """
+        if not pyagram_flag.is_dirty and pyagram_flag in self.element_encodings:
+            return self.element_encodings[pyagram_flag]
         is_hidden = pyagram_flag.is_hidden()
         if pyagram_flag.is_call_flag:
             flag_type = 'call'
@@ -37,7 +90,7 @@ class Encoder:
             flag_type = 'comp'
         else:
             raise enum.PyagramFlagTypes.illegal_enum(pyagram_flag.flag_type)
-        return {
+        encoding = {
             'type': flag_type,
             'is_curr_element': pyagram_flag is self.state.program_state.curr_element,
             'banner': [
@@ -61,18 +114,23 @@ class Encoder:
                 ],
             'self': pyagram_flag, # For postprocessing.
         }
+        self.element_encodings[pyagram_flag] = encoding
+        pyagram_flag.is_dirty = False
+        return encoding
 
     def encode_pyagram_frame(self, pyagram_frame):
         """
         """
-        return {
+        if not pyagram_frame.is_dirty and pyagram_frame in self.element_encodings:
+            return self.element_encodings[pyagram_frame]
+        encoding = {
             'type': 'function',
             'is_curr_element': pyagram_frame is self.state.program_state.curr_element,
-            'name': repr(pyagram_frame),
+            'name': self.intern_string(repr(pyagram_frame)),
             'parent':
                 None
                 if pyagram_frame.parent is None
-                else repr(pyagram_frame.parent),
+                else self.intern_string(repr(pyagram_frame.parent)),
             'bindings': self.encode_mapping(
                 pyagram_frame.bindings if pyagram_frame.shows_bindings else {},
                 is_bindings=True,
@@ -86,6 +144,9 @@ class Encoder:
                 for flag in pyagram_frame.flags
             ],
         }
+        self.element_encodings[pyagram_frame] = encoding
+        pyagram_frame.is_dirty = False
+        return encoding
 
     def encode_banner_element(self, pyagram_flag, banner_element):
         """
@@ -121,7 +182,7 @@ class Encoder:
             else:
                 bindings = None
             return {
-                'code': code,
+                'code': self.intern_string(code),
                 'n_cols':
                     2 * len(bindings) - 1 + sum(
                         binding['key'] is not None
@@ -133,7 +194,7 @@ class Encoder:
             }
         elif pyagram_flag.is_comp_flag:
             return {
-                'code': banner_element,
+                'code': self.intern_string(banner_element),
             }
         else:
             raise enum.PyagramFlagTypes.illegal_enum(pyagram_flag.flag_type)
@@ -166,7 +227,7 @@ class Encoder:
         elif reference_type is enum.ReferenceTypes.UNKNOWN:
             return {'type': 'unknown'}
         elif reference_type is enum.ReferenceTypes.DEFAULT:
-            object_type = enum.ObjectTypes.identify_raw_object_type(object)
+            object_type = object_registry.OBJECT_REGISTRY.identify_object_type(object)
             if object_type is enum.ObjectTypes.PRIMITIVE:
                 return str(object) if is_bindings or type(object) is not str else repr(object)
             else:
@@ -177,54 +238,10 @@ class Encoder:
     def encode_object(self, object):
         """
         """
-        object_type = enum.ObjectTypes.identify_tracked_object_type(object)
-        if object_type is enum.ObjectTypes.FUNCTION:
-            encoding = 'function'
-            data = self.encode_function(object)
-        elif object_type is enum.ObjectTypes.METHOD:
-            encoding = 'method'
-            data = self.encode_method(object)
-        elif object_type is enum.ObjectTypes.BUILTIN:
-            encoding = 'builtin'
-            data = self.encode_builtin(object)
-        elif object_type is enum.ObjectTypes.ORDERED_COLLECTION:
-            encoding = 'ordered_collection'
-            data = self.encode_collection(object)
-        elif object_type is enum.ObjectTypes.UNORDERED_COLLECTION:
-            encoding = 'unordered_collection'
-            data = self.encode_collection(object)
-        elif object_type is enum.ObjectTypes.MAPPING:
-            encoding = 'mapping'
-            data = self.encode_mapping(object)
-        elif object_type is enum.ObjectTypes.ITERATOR:
-            encoding = 'iterator'
-            data = self.encode_iterator(object)
-        elif object_type is enum.ObjectTypes.GENERATOR:
-            encoding = 'generator'
-            data = self.encode_generator(object)
-        elif object_type is enum.ObjectTypes.USER_CLASS:
-            encoding = 'class'
-            data = self.encode_user_class(object)
-        elif object_type is enum.ObjectTypes.BLTN_CLASS:
-            encoding = 'class'
-            data = self.encode_bltn_class(object)
-        elif object_type is enum.ObjectTypes.INSTANCE:
-            encoding = 'instance'
-            data = self.encode_instance(object)
-        elif object_type is enum.ObjectTypes.RANGE:
-            encoding = 'range'
-            data = self.encode_range(object)
-        elif object_type is enum.ObjectTypes.SLICE:
-            encoding = 'slice'
-            data = self.encode_slice(object)
-        elif object_type is enum.ObjectTypes.OTHER:
-            encoding = 'other'
-            data = self.encode_other(object)
-        else:
-            raise enum.ObjectTypes.illegal_enum(object_type)
+        handler = object_registry.OBJECT_REGISTRY.get_handler(type(object))
         return {
-            'encoding': encoding,
-            'data': data,
+            'encoding': handler.encoding,
+            'data': handler.encode(self, object),
         }
 
     def encode_function(self, object):
@@ -236,23 +253,25 @@ class Encoder:
                 object.__code__.co_firstlineno,
                 max_lineno=self.num_lines,
             )
+        signature_parameters, _, is_gen_func, _ = self.state.memory_state.get_function_summary(object)
         parameters, slash_arg_index, has_star_arg = [], None, False
-        for i, parameter in enumerate(inspect.signature(object).parameters.values()):
+        for i, parameter in enumerate(signature_parameters.values()):
             if parameter.kind is inspect.Parameter.POSITIONAL_ONLY:
                 slash_arg_index = i + 1
             elif parameter.kind is inspect.Parameter.VAR_POSITIONAL:
                 has_star_arg = True
             elif parameter.kind is inspect.Parameter.KEYWORD_ONLY and not has_star_arg:
                 parameters.append({
-                    'name': '*',
+                    'name': self.intern_string('*'),
                     'default': None,
                 })
                 has_star_arg = True
             parameters.append({
-                'name':
+                'name': self.intern_string(
                     str(parameter)
                     if parameter.default is inspect.Parameter.empty
-                    else str(parameter).split('=', 1)[0],
+                    else str(parameter).split('=', 1)[0]
+                ),
                 'default':
                     None
                     if parameter.default is inspect.Parameter.empty
@@ -260,13 +279,13 @@ class Encoder:
             })
         if slash_arg_index is not None:
             slash_arg = {
-                'name': '/',
+                'name': self.intern_string('/'),
                 'default': None,
             }
             parameters.insert(slash_arg_index, slash_arg)
         return {
-            'is_gen_func': inspect.isgeneratorfunction(object),
-            'name': object.__name__,
+            'is_gen_func': is_gen_func,
+            'name': self.intern_string(object.__name__),
             'lambda_id':
                 {
                     'lineno': lineno,
@@ -276,7 +295,7 @@ class Encoder:
                 if is_lambda
                 else None,
             'parameters': parameters,
-            'parent': repr(self.state.memory_state.function_parents[object]),
+            'parent': self.intern_string(repr(self.state.memory_state.function_parents[object])),
         }
 
     def encode_method(self, object):
@@ -291,7 +310,7 @@ class Encoder:
         """
         """
         return {
-            'name': object.__name__,
+            'name': self.intern_string(object.__name__),
             'instance':
                 self.encode_reference(object.__self__)
                 if hasattr(object, '__self__') and not inspect.ismodule(object.__self__)
@@ -309,9 +328,14 @@ class Encoder:
             ],
         }
 
-    def encode_mapping(self, object, *, keyless=False, is_bindings=False):
+    def encode_mapping(self, object, *, keyless=False, is_bindings=False, interns_keys=True):
         """
         """
+
+        # The keys of bindings are interned, except in an instance's bindings. An instance's __dict__
+        # can have keys that are not strings, which get encoded as object IDs, and src/scripts/decode.js
+        # could not tell those apart from indices into the string table.
+
         if keyless:
             items = [
                 {
@@ -323,7 +347,10 @@ class Encoder:
         else:
             items = [
                 {
-                    'key': self.encode_reference(key, is_bindings=is_bindings),
+                    'key':
+                        self.encode_binding_key(key)
+                        if is_bindings and interns_keys
+                        else self.encode_reference(key, is_bindings=is_bindings),
                     'value': self.encode_reference(value),
                 }
                 for key, value in object.items()
@@ -336,10 +363,16 @@ class Encoder:
                 'items': items,
             }
 
+    def encode_binding_key(self, key):
+        """
+        """
+        encoding = self.encode_reference(key, is_bindings=True)
+        return self.intern_string(encoding) if type(encoding) is str else encoding
+
     def encode_iterator(self, object):
         """
         """
-        iterable = utils.get_iterable(object)
+        iterable = self.state.memory_state.get_iterable(object)
         return None if iterable is None else {
             'object': self.encode_reference(iterable),
             'index': len(iterable) - object.__length_hint__(),
@@ -356,11 +389,11 @@ class Encoder:
         if results is not None:
             return_value, yield_from = results
         return {
-            'name': object.generator.__name__,
+            'name': self.intern_string(object.generator.__name__),
             'frame': {
                 'type': 'generator',
-                'name': f'Frame {object.number}',
-                'parent': repr(object.parent),
+                'name': self.intern_string(f'Frame {object.number}'),
+                'parent': self.intern_string(repr(object.parent)),
                 'bindings': self.encode_mapping(
                     object.bindings,
                     is_bindings=True,
@@ -388,10 +421,11 @@ class Encoder:
             'type': 'class',
             'bltn': False,
             'is_curr_element': False,
-            'name':
+            'name': self.intern_string(
                 object.frame.f_code.co_name
                 if object.class_obj is None
-                else object.class_obj.__name__,
+                else object.class_obj.__name__
+            ),
             'parents':
                 None # For postprocessing.
                 if object.class_obj is None
@@ -412,7 +446,7 @@ class Encoder:
             'type': 'class',
             'bltn': True,
             'is_curr_element': False,
-            'name': object.__name__,
+            'name': self.intern_string(object.__name__),
             'parents': self.encode_class_parents(object),
             'bindings': self.encode_mapping(
                 {},
@@ -425,7 +459,7 @@ class Encoder:
     def encode_class_parents(self, class_obj):
         """
         """
-        return [parent.__name__ for parent in class_obj.__bases__]
+        return [self.intern_string(parent.__name__) for parent in class_obj.__bases__]
 
     def encode_instance(self, object):
         """
@@ -433,11 +467,12 @@ class Encoder:
         return {
             'type': 'instance',
             'is_curr_element': False,
-            'name': type(object).__name__,
-            'parent': type(object).__name__,
+            'name': self.intern_string(type(object).__name__),
+            'parent': self.intern_string(type(object).__name__),
             'bindings': self.encode_mapping(
                 object.__dict__,
                 is_bindings=True,
+                interns_keys=False,
             ),
             'return_value': None,
             'flags': [],
@@ -466,17 +501,101 @@ class Encoder:
         """
         return repr(object)
 
-def encode_pyagram_result(*result):
+def encode_pyagram_result(*result, delta=False):
     """
     """
     state, postprocessor = result
     return {
-        'snapshots': state.snapshots,
+        'snapshots': encode_snapshot_deltas(state.snapshots) if delta else state.snapshots,
         'global_data': {
             'obj_numbers': postprocessor.obj_numbers,
+            'print_output': state.print_output.getvalue(),
+            'truncated': state.truncation,
+            'strings': state.encoder.strings,
         },
+        'delta': delta,
+    }
+
+def encode_pyagram_session(session_id, result, *, page_size, delta=False):
+    """
+    """
+
+    # Like encode_pyagram_result, but only the first page of snapshots is included. The rest can be
+    # fetched with encode_pyagram_page, using the session ID.
+
+    return {
+        'session_id': session_id,
+        'num_snapshots': len(result['snapshots']),
+        'page_size': page_size,
+        'snapshots': encode_pyagram_page(result, 0, page_size, delta=delta)['snapshots'],
+        'global_data': result['global_data'],
+        'delta': delta,
+    }
+
+def encode_pyagram_page(result, start, stop, *, delta=False):
+    """
+    """
+
+    # With delta encoding, the first snapshot of each page is sent in full, so that every page can be
+    # decoded on its own.
+
+    snapshots = result['snapshots'][start:stop]
+    return {
+        'start': start,
+        'snapshots': encode_snapshot_deltas(snapshots) if delta else snapshots,
     }
 
+def encode_snapshot_deltas(snapshots):
+    """
+    """
+
+    # The first snapshot is sent in full, and every other snapshot is sent as a patch to the one
+    # before it. See encode_delta.
+
+    return [
+        snapshot if i == 0 else encode_delta(snapshots[i - 1], snapshot)
+        for i, snapshot in enumerate(snapshots)
+    ]
+
+def encode_delta(old, new):
+    """
+    """
+
+    # Encode `new` as a patch to `old`, or return None if they are the same. A patch is one of:
+    # {'d': {key: patch, ...}}              Update some keys of a dict that keeps the same keys.
+    # {'l': length, 'i': {index: patch}}    Resize a list, then update some of its indices.
+    # {'a': suffix}                         Append to a string.
+    # {'v': value}                          Replace the value outright.
+    # Values are compared by type as well as value, since `True == 1` but they encode differently.
+
+    if type(old) is not type(new):
+        return {'v': new}
+    elif type(new) is dict:
+        if old.keys() != new.keys():
+            return {'v': new}
+        patches = {}
+        for key, value in new.items():
+            patch = encode_delta(old[key], value)
+            if patch is not None:
+                patches[key] = patch
+        return {'d': patches} if 0 < len(patches) else None
+    elif type(new) is list:
+        patches = {}
+        for i, value in enumerate(new):
+            patch = encode_delta(old[i], value) if i < len(old) else {'v': value}
+            if patch is not None:
+                patches[i] = patch
+        return {'l': len(new), 'i': patches} if 0 < len(patches) or len(old) != len(new) else None
+    elif type(new) is str:
+        if old == new:
+            return None
+        elif new.startswith(old):
+            return {'a': new[len(old):]}
+        else:
+            return {'v': new}
+    else:
+        return None if old == new else {'v': new}
+
 def encode_pyagram_error(error):
     """
     """
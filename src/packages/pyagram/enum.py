@@ -2,7 +2,6 @@ import inspect
 
 from . import constants
 from . import exception
-from . import pyagram_wrapped_object
 
 class Enum:
     """
@@ -132,63 +131,6 @@ class ObjectTypes(Enum):
     SLICE = object()
     OTHER = object()
 
-    @staticmethod
-    def identify_raw_object_type(object):
-        """
-        """
-        object_type = type(object)
-        if object_type in constants.PRIMITIVE_TYPES:
-            return ObjectTypes.PRIMITIVE
-        elif object_type in constants.FUNCTION_TYPES:
-            return ObjectTypes.FUNCTION
-        elif object_type in constants.METHOD_TYPES:
-            return ObjectTypes.METHOD
-        elif object_type in constants.BUILTIN_TYPES:
-            return ObjectTypes.BUILTIN
-        elif object_type in constants.ORDERED_COLLECTION_TYPES:
-            return ObjectTypes.ORDERED_COLLECTION
-        elif object_type in constants.UNORDERED_COLLECTION_TYPES:
-            return ObjectTypes.UNORDERED_COLLECTION
-        elif object_type in constants.MAPPING_TYPES:
-            return ObjectTypes.MAPPING
-        elif object_type in constants.ITERATOR_TYPES:
-            return ObjectTypes.ITERATOR
-        elif object_type in constants.GENERATOR_TYPES:
-            return ObjectTypes.GENERATOR
-        else:
-            return ObjectTypes.OTHER
-
-    @staticmethod
-    def identify_tracked_object_type(object):
-        """
-        """
-        raw_object_type = ObjectTypes.identify_raw_object_type(object)
-        if raw_object_type is ObjectTypes.OTHER:
-            object_type = type(object)
-            if object_type is pyagram_wrapped_object.PyagramGeneratorFrame:
-                return ObjectTypes.GENERATOR
-            elif object_type is pyagram_wrapped_object.PyagramClassFrame:
-                return ObjectTypes.USER_CLASS
-            elif object_type is range:
-                return ObjectTypes.RANGE
-            elif object_type is slice:
-                return ObjectTypes.SLICE
-            elif object_type is type:
-                return ObjectTypes.BLTN_CLASS
-            elif hasattr(object, '__dict__'):
-                return ObjectTypes.INSTANCE
-            else:
-                return ObjectTypes.OTHER
-        else:
-            assert raw_object_type not in {
-                ObjectTypes.PRIMITIVE,
-                ObjectTypes.GENERATOR,
-                ObjectTypes.USER_CLASS,
-                ObjectTypes.BLTN_CLASS,
-                ObjectTypes.INSTANCE,
-            }
-            return raw_object_type
-
 class ErrorTypes(Enum):
     """
     """
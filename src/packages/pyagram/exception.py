@@ -21,6 +21,18 @@ class CallWrapperInterruption(Exception):
         """
         return (self.lineno, self.col_offset)
 
+class BudgetExceededException(BaseException):
+    """
+    """
+
+    # Raised from within the tracer once the pyagram has used up its Budget. The snapshots taken
+    # until then are still valid, so they get postprocessed and returned as usual. Like
+    # KeyboardInterrupt, it is not an Exception, so `except Exception` in the user's code won't
+    # catch it.
+
+    def __init__(self, message):
+        self.message = message
+
 class HiddenSnapshotException(Exception):
     """
     """
@@ -0,0 +1,103 @@
+import weakref
+
+class ObjectHandler:
+    """
+    """
+
+    # Everything pyagram does with one type of object: the ObjectTypes it is identified as, and the
+    # functions that fingerprint it, find its referents, measure its size and encode it (the latter
+    # along with the name of its encoding). Primitives are never tracked, so their handler has none
+    # of these functions.
+
+    __slots__ = (
+        'object_type',
+        'get_fingerprint',
+        'get_referents',
+        'get_size',
+        'encoding',
+        'encode',
+    )
+
+    def __init__(
+        self,
+        object_type,
+        *,
+        get_fingerprint=None,
+        get_referents=None,
+        get_size=None,
+        encoding=None,
+        encode=None,
+    ):
+        self.object_type = object_type
+        self.get_fingerprint = get_fingerprint
+        self.get_referents = get_referents
+        self.get_size = get_size
+        self.encoding = encoding
+        self.encode = encode
+
+class ObjectRegistry:
+    """
+    """
+
+    # Maps each type to the ObjectHandler for its objects. A type that has no handler of its own gets
+    # the handler of the first class in its MRO that has one for its subclasses too. For instance, a
+    # subclass of list is drawn as an instance, since list's handler is only for lists themselves and
+    # a subclass may override methods like __iter__, which would run (and trace) the user's code. A
+    # registration can also have a condition, which the type must satisfy for the handler to apply.
+    #
+    # Each type is only resolved once. Registered types are cached as they are, but the rest (which
+    # include the user's classes) are cached weakly, so that the cache does not keep them alive after
+    # their pyagram is drawn.
+
+    __slots__ = (
+        'registrations',
+        'handlers',
+        'resolved_handlers',
+    )
+
+    def __init__(self):
+        self.registrations = {}
+        self.handlers = {}
+        self.resolved_handlers = weakref.WeakKeyDictionary()
+
+    def register(self, object_types, handler, *, subclasses=False, condition=None):
+        """
+        """
+
+        # A type that is already registered keeps its handler. For instance, str is both a primitive
+        # and an ordered collection, but it counts as a primitive since that is registered first.
+
+        for object_type in object_types:
+            registrations = self.registrations.setdefault(object_type, [])
+            if not registrations and condition is None:
+                self.handlers[object_type] = handler
+            registrations.append((handler, subclasses, condition))
+        self.resolved_handlers.clear()
+
+    def get_handler(self, object_type):
+        """
+        """
+        handler = self.handlers.get(object_type)
+        if handler is None:
+            handler = self.resolved_handlers.get(object_type)
+            if handler is None:
+                handler = self.resolve_handler(object_type)
+                self.resolved_handlers[object_type] = handler
+        return handler
+
+    def resolve_handler(self, object_type):
+        """
+        """
+        for base_type in object_type.__mro__:
+            for handler, subclasses, condition in self.registrations.get(base_type, []):
+                if (base_type is object_type or subclasses) \
+                        and (condition is None or condition(object_type)):
+                    return handler
+        raise TypeError(f'no handler is registered for {object_type}')
+
+    def identify_object_type(self, object):
+        """
+        """
+        return self.get_handler(type(object)).object_type
+
+OBJECT_REGISTRY = ObjectRegistry()
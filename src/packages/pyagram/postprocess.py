@@ -1,3 +1,5 @@
+import bisect
+
 from . import constants
 from . import encode
 from . import enum
@@ -12,15 +14,28 @@ class Postprocessor:
         self.state = state
         self.terminal_ex = terminal_ex
         self.obj_numbers = {}
+        self.flag_snapshot_cache = {}
+        self.object_snapshot_cache = {}
+        self.encoding_hashes = {}
 
     def postprocess(self):
         """
         """
+        self.state.snapshots = list(self.iter_snapshots())
+
+    def iter_snapshots(self):
+        """
+        """
+
+        # Postprocess the snapshots one at a time, so each raw snapshot can be dropped as soon as it is
+        # done with. The object numbers are only known once the last snapshot has been postprocessed.
+
         self.kill_excess_snapshots()
-        self.postprocess_snapshots()
-        self.kill_hidden_snapshots()
-        self.kill_static_snapshots() # TODO: Consider deleting this.
-        self.encode_object_numbers()
+        last_snapshot = None
+        for snapshot in self.kill_hidden_and_static_snapshots(self.postprocess_snapshots()):
+            last_snapshot = snapshot
+            yield snapshot
+        self.encode_object_numbers(last_snapshot)
 
     def kill_excess_snapshots(self):
         """
@@ -33,93 +48,222 @@ class Postprocessor:
     def postprocess_snapshots(self):
         """
         """
+
+        # The Encoder and MemoryState share the encodings of unchanged elements and objects between
+        # snapshots, so the snapshots are rebuilt here instead of modified in place.
+
         for i, snapshot in enumerate(self.state.snapshots):
+            self.state.snapshots[i] = None
             try:
-                self.postprocess_frame_snapshot(i, snapshot['global_frame'])
-                self.postprocess_memory_snapshot(i, snapshot['memory_state'])
+                snapshot['global_frame'] = self.postprocess_frame_snapshot(i, snapshot['global_frame'])
+                snapshot['memory_state'] = self.postprocess_memory_snapshot(i, snapshot['memory_state'])
             except exception.HiddenSnapshotException:
-                self.state.snapshots[i] = None
+                yield None, None
+            else:
+                yield snapshot, self.hash_snapshot(snapshot)
 
     def postprocess_element_snapshot(self, snapshot_index, element_snapshot):
         """
         """
-        i, flags = 0, element_snapshot['flags']
-        while i < len(flags):
-            if self.postprocess_flag_snapshot(snapshot_index, flags[i]) == constants.HIDDEN_FLAG_CODE:
-                flags[i : i + 1] = flags[i]['flags']
+        return self.postprocess_flag_snapshots(snapshot_index, element_snapshot['flags'])
+
+    def postprocess_flag_snapshots(self, snapshot_index, flag_snapshots):
+        """
+        """
+        flags = []
+        for flag_snapshot in flag_snapshots:
+            postprocessed_flag_snapshot = self.postprocess_flag_snapshot(snapshot_index, flag_snapshot)
+            if postprocessed_flag_snapshot == constants.HIDDEN_FLAG_CODE:
+                flags.extend(self.postprocess_flag_snapshots(snapshot_index, flag_snapshot['flags']))
             else:
-                i += 1
+                flags.append(postprocessed_flag_snapshot)
+        return flags
 
     def postprocess_flag_snapshot(self, snapshot_index, flag_snapshot):
         """
         """
-        pyagram_flag = flag_snapshot.pop('self')
+
+        # A flag snapshot shared by many snapshots postprocesses the same way for every snapshot index
+        # that hides the same flags in it, so only postprocess it once for each such group of indices.
+
+        if len(self.state.program_state.new_banners) == 0:
+            _, hidden_snapshots, postprocessed_flag_snapshots = self.get_flag_snapshot_cache(flag_snapshot)
+            hidden_snapshots_key = bisect.bisect_right(hidden_snapshots, snapshot_index)
+            if hidden_snapshots_key not in postprocessed_flag_snapshots:
+                postprocessed_flag_snapshots[hidden_snapshots_key] = self.postprocess_uncached_flag_snapshot(
+                    snapshot_index,
+                    flag_snapshot,
+                )
+            return postprocessed_flag_snapshots[hidden_snapshots_key]
+        else:
+            return self.postprocess_uncached_flag_snapshot(snapshot_index, flag_snapshot)
+
+    def get_flag_snapshot_cache(self, flag_snapshot):
+        """
+        """
+
+        # The cache is keyed by ID, so each entry keeps its flag snapshot alive to prevent the ID from
+        # getting reused.
+
+        cache_entry = self.flag_snapshot_cache.get(id(flag_snapshot))
+        if cache_entry is None or cache_entry[0] is not flag_snapshot:
+            hidden_snapshots = {flag_snapshot['self'].hidden_snapshot}
+            sub_flag_snapshots = flag_snapshot['flags'] + (
+                []
+                if flag_snapshot['frame'] is None
+                else flag_snapshot['frame']['flags']
+            )
+            for sub_flag_snapshot in sub_flag_snapshots:
+                _, sub_hidden_snapshots, _ = self.get_flag_snapshot_cache(sub_flag_snapshot)
+                hidden_snapshots.update(sub_hidden_snapshots)
+            cache_entry = (flag_snapshot, tuple(sorted(hidden_snapshots)), {})
+            self.flag_snapshot_cache[id(flag_snapshot)] = cache_entry
+        return cache_entry
+
+    def postprocess_uncached_flag_snapshot(self, snapshot_index, flag_snapshot):
+        """
+        """
+        pyagram_flag = flag_snapshot['self']
         if pyagram_flag.is_hidden(snapshot_index):
             if flag_snapshot['is_curr_element']:
                 raise exception.HiddenSnapshotException()
             else:
                 return constants.HIDDEN_FLAG_CODE
 
+        banner_snapshot = flag_snapshot['banner']
         if pyagram_flag in self.state.program_state.new_banners:
             # TODO: Kinda messy, maybe at least abstract it.
-            old_fn_code = flag_snapshot['banner'][0]['code']
+            old_fn_code = banner_snapshot[0]['code']
             new_fn_code = self.state.program_state.new_banners[pyagram_flag]
             if old_fn_code == new_fn_code:
                 del self.state.program_state.new_banners[pyagram_flag]
             else:
-                flag_snapshot['banner'][0]['code'] = new_fn_code
+                banner_snapshot = [
+                    {**banner_snapshot[0], 'code': new_fn_code},
+                    *banner_snapshot[1:],
+                ]
 
         frame_snapshot = flag_snapshot['frame']
-        if frame_snapshot is not None:
-            self.postprocess_frame_snapshot(snapshot_index, frame_snapshot)
-        self.postprocess_element_snapshot(snapshot_index, flag_snapshot)
+        return {
+            **{
+                key: value
+                for key, value in flag_snapshot.items()
+                if key != 'self'
+            },
+            'banner': banner_snapshot,
+            'frame':
+                None
+                if frame_snapshot is None
+                else self.postprocess_frame_snapshot(snapshot_index, frame_snapshot),
+            'flags': self.postprocess_element_snapshot(snapshot_index, flag_snapshot),
+        }
 
     def postprocess_frame_snapshot(self, snapshot_index, frame_snapshot):
         """
         """
-        self.postprocess_element_snapshot(snapshot_index, frame_snapshot)
+        return {
+            **frame_snapshot,
+            'flags': self.postprocess_element_snapshot(snapshot_index, frame_snapshot),
+        }
 
     def postprocess_memory_snapshot(self, snapshot_index, memory_snapshot):
         """
         """
-        for encode_object in memory_snapshot:
-            encoding = encode_object['object']['encoding']
-            snapshot = encode_object['object']['data']
-            if encoding == 'class' and 'self' in snapshot:
-                class_frame = snapshot.pop('self')
-                if snapshot['parents'] is None:
-                    snapshot['parents'] = class_frame.initial_bases
+        return [
+            self.postprocess_object_snapshot(snapshot_index, object_snapshot)
+            for object_snapshot in memory_snapshot
+        ]
 
-    def kill_hidden_snapshots(self):
+    def postprocess_object_snapshot(self, snapshot_index, object_snapshot):
         """
         """
-        i = 0
-        while i < len(self.state.snapshots):
-            if self.state.snapshots[i] is None:
-                del self.state.snapshots[i]
-            else:
-                i += 1
+        encoding = object_snapshot['object']['encoding']
+        snapshot = object_snapshot['object']['data']
+        if encoding == 'class' and 'self' in snapshot:
+            cache_entry = self.object_snapshot_cache.get(id(object_snapshot))
+            if cache_entry is None or cache_entry[0] is not object_snapshot:
+                class_frame = snapshot['self']
+                cache_entry = (object_snapshot, {
+                    **object_snapshot,
+                    'object': {
+                        **object_snapshot['object'],
+                        'data': {
+                            **{
+                                key: value
+                                for key, value in snapshot.items()
+                                if key != 'self'
+                            },
+                            'parents':
+                                class_frame.initial_bases
+                                if snapshot['parents'] is None
+                                else snapshot['parents'],
+                        },
+                    },
+                })
+                self.object_snapshot_cache[id(object_snapshot)] = cache_entry
+            return cache_entry[1]
+        else:
+            return object_snapshot
+
+    def hash_snapshot(self, snapshot):
+        """
+        """
+        return hash(tuple(
+            self.hash_encoding(value)
+            for key, value in snapshot.items()
+            if key != 'curr_line_no'
+        ))
+
+    def hash_encoding(self, encoding):
+        """
+        """
+
+        # Most dicts in a snapshot are shared with the snapshots around it, so their hashes are cached
+        # by ID. Like the other caches, each entry keeps its dict alive so the ID cannot get reused.
+
+        if isinstance(encoding, dict):
+            cache_entry = self.encoding_hashes.get(id(encoding))
+            if cache_entry is None or cache_entry[0] is not encoding:
+                cache_entry = (encoding, hash(tuple(
+                    (key, self.hash_encoding(value))
+                    for key, value in encoding.items()
+                )))
+                self.encoding_hashes[id(encoding)] = cache_entry
+            return cache_entry[1]
+        elif isinstance(encoding, list):
+            return hash(tuple(self.hash_encoding(value) for value in encoding))
+        else:
+            return hash(encoding)
+
+    def kill_hidden_and_static_snapshots(self, hashed_snapshots):
+        """
+        """
+
+        # Drop the hidden snapshots, and every snapshot that only differs from the one before it in
+        # its line number. Snapshots are only compared in full if their hashes match.
+
+        prev_snapshot, prev_snapshot_hash = None, None
+        for snapshot, snapshot_hash in hashed_snapshots:
+            if snapshot is None:
+                continue
+            if prev_snapshot is not None \
+                and prev_snapshot_hash == snapshot_hash \
+                and self.is_static_snapshot(prev_snapshot, snapshot):
+                continue
+            yield snapshot
+            prev_snapshot, prev_snapshot_hash = snapshot, snapshot_hash
 
-    def kill_static_snapshots(self):
+    def is_static_snapshot(self, former_snapshot, latter_snapshot):
         """
         """
-        # TODO: After you finish implementing the snapshotting logic in pyagram_state.py, see if you still need this function.
-        # TODO: If you keep this function, make it count up from 0, not down from len.
-        # TODO: Refactor / clean up this function.
-        i = len(self.state.snapshots) - 1
-        while 0 < i:
-            former_snapshot = self.state.snapshots[i - 1]
-            latter_snapshot = self.state.snapshots[i]
-            former_line_no = former_snapshot.pop('curr_line_no')
-            latter_line_no = latter_snapshot.pop('curr_line_no')
-            if former_snapshot == latter_snapshot:
-                del self.state.snapshots[i]
-            former_snapshot['curr_line_no'] = former_line_no
-            latter_snapshot['curr_line_no'] = latter_line_no
-            i -= 1
+        return all(
+            former_snapshot[key] == latter_snapshot[key]
+            for key in former_snapshot
+            if key != 'curr_line_no'
+        )
 
-    def encode_object_numbers(self):
+    def encode_object_numbers(self, last_snapshot):
         """
         """
-        for i, encode_object in enumerate(self.state.snapshots[-1]['memory_state']):
+        for i, encode_object in enumerate(last_snapshot['memory_state']):
             self.obj_numbers[encode_object['id']] = i + 1
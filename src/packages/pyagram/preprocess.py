@@ -1,4 +1,5 @@
 import ast
+import marshal
 
 from . import banner
 from . import constants
@@ -8,13 +9,15 @@ class Preprocessor:
     """
     """
 
-    def __init__(self, code, *, interrupt_data):
+    def __init__(self, code, *, interrupt_data, cache=None):
         self.code = code
         self.num_lines = len(code.split('\n'))
-        self.ast = ast.parse(code)
+        self.ast = None
         self.new_node_linenos = []
         self.lambdas_by_line = {}
+        self.lambdas_per_line = None
         self.interrupt_data = interrupt_data
+        self.cache = cache
 
     @property
     def summary(self):
@@ -22,12 +25,50 @@ class Preprocessor:
         """
         return (
             self.num_lines,
-            {line: len(lambdas) for line, lambdas in self.lambdas_by_line.items()},
+            self.lambdas_per_line,
         )
 
     def preprocess(self):
         """
         """
+
+        # The compiled code depends on nothing but the source code and the interruption data, so it
+        # can be cached. A cache entry also records the locations that preprocessing exempted, since
+        # those get added to the interruption data as a side effect. It records the number of lines
+        # too, since the compiled code's line numbers are encoded with it. (Codes that only differ in
+        # their line endings or trailing whitespace share a cache entry.)
+
+        if self.cache is None:
+            self.preprocess_ast()
+            return
+        key = self.cache.make_key(
+            self.code,
+            exempt_fn_locs=sorted(self.interrupt_data.exempt_fn_locs),
+        )
+        serialization = self.cache.get(key)
+        if serialization is None:
+            self.preprocess_ast()
+            try:
+                serialization = marshal.dumps((
+                    self.num_lines,
+                    self.ast,
+                    self.lambdas_per_line,
+                    self.interrupt_data.exempt_fn_locs,
+                ))
+            except ValueError:
+                return
+            self.cache.put(key, serialization)
+        else:
+            self.num_lines, self.ast, self.lambdas_per_line, exempt_fn_locs = marshal.loads(
+                serialization,
+            )
+            self.interrupt_data.exempt_fn_locs.update(exempt_fn_locs)
+
+    def preprocess_ast(self):
+        """
+        """
+        self.ast = ast.parse(self.code)
+        self.exempt_super_calls()
         code_wrapper = CodeWrapper(self)
         self.ast = code_wrapper.visit(self.ast)
         self.update_linenos()
@@ -38,6 +79,26 @@ class Preprocessor:
             filename=constants.USERCODE_FILENAME,
             mode='exec',
         )
+        self.lambdas_per_line = {
+            line: len(lambdas)
+            for line, lambdas in self.lambdas_by_line.items()
+        }
+
+    def exempt_super_calls(self):
+        """
+        """
+
+        # A call to `super` with no arguments only works in the frame of the method that makes it, so
+        # it must not get wrapped. Finding these calls ahead of time saves a CallWrapperInterruption,
+        # and hence a re-run of the whole program, for each of them.
+
+        for node in ast.walk(self.ast):
+            if isinstance(node, ast.Call) \
+                and isinstance(node.func, ast.Name) \
+                and node.func.id == 'super' \
+                and len(node.args) == 0 \
+                and len(node.keywords) == 0:
+                self.interrupt_data.exempt_fn_locs.add((node.lineno, node.col_offset))
 
     def update_linenos(self):
         """
@@ -75,10 +136,7 @@ class CodeWrapper(ast.NodeTransformer):
     def is_exempt(self, node):
         """
         """
-        for lineno, col_offset in self.preprocessor.interrupt_data.exempt_fn_locs:
-            if node.lineno == lineno and node.col_offset == col_offset:
-                return True
-        return False
+        return (node.lineno, node.col_offset) in self.preprocessor.interrupt_data.exempt_fn_locs
 
     def mod_lineno(self, node, step_code):
         """
@@ -1,5 +1,4 @@
 import io
-import sys
 
 from . import constants
 from . import encode
@@ -8,76 +7,97 @@ from . import interruption_data
 from . import postprocess
 from . import preprocess
 from . import pyagram_state
+from . import stdout_capture
 from . import trace
 
 class Pyagram:
     """
     """
 
-    def __init__(self, code, *, debug):
-        initial_stdout = sys.stdout
+    def __init__(
+        self,
+        code,
+        *,
+        debug,
+        delta=False,
+        code_cache=None,
+        snapshot_policy=None,
+        budget=None,
+    ):
+        self.truncation = None
+        if budget is not None:
+            budget.start()
         interrupt_data = interruption_data.InterruptionData()
         while True:
             new_stdout = io.StringIO()
             try:
-                try:
-                    preprocessor = preprocess.Preprocessor(code, interrupt_data=interrupt_data)
-                    preprocessor.preprocess()
-                except SyntaxError as exc:
-                    self.encoding = 'error'
-                    self.data = encode.encode_pyagram_error(exc)
-                else:
-                    state = pyagram_state.State(
-                        preprocessor.summary,
-                        new_stdout,
-                        interrupt_data=interrupt_data,
-                    )
-                    tracer = trace.Tracer(state)
-                    bindings = {}
-                    sys.stdout = new_stdout
-                    terminal_ex = False
+                with stdout_capture.capture_stdout(new_stdout):
                     try:
-                        tracer.run(
-                            preprocessor.ast,
-                            globals=bindings,
-                            locals=bindings,
+                        preprocessor = preprocess.Preprocessor(
+                            code,
+                            interrupt_data=interrupt_data,
+                            cache=code_cache,
                         )
-                    except exception.PyagramError as exc:
-                        raise exc
-                    except exception.CallWrapperInterruption as exc:
-                        interrupt_data.exempt_fn_locs.add(exc.location)
-                        continue
-                    except exception.UnsupportedOperatorException as exc:
-                        state.step()
-                        state.program_state.caught_exc_info = (
-                            type(exc),
-                            exc.message,
-                            state.program_state.curr_line_no,
-                        )
-                        state.step()
-                    except Exception as exc:
-                        terminal_ex = True
-                        assert state.program_state.curr_element.is_global_frame
-                        # TODO: You won't need terminal_ex if you don't take extraneous snapshots.
+                        preprocessor.preprocess()
+                    except SyntaxError as exc:
+                        self.encoding = 'error'
+                        self.data = encode.encode_pyagram_error(exc)
                     else:
-                        assert state.program_state.curr_element.is_global_frame
-                    postprocessor = postprocess.Postprocessor(state, terminal_ex)
-                    postprocessor.postprocess()
-                    self.encoding = 'result'
-                    self.data = encode.encode_pyagram_result(state, postprocessor)
+                        state = pyagram_state.State(
+                            preprocessor.summary,
+                            new_stdout,
+                            interrupt_data=interrupt_data,
+                            policy=snapshot_policy,
+                            budget=budget,
+                        )
+                        tracer = trace.Tracer(state)
+                        bindings = {}
+                        terminal_ex = False
+                        try:
+                            tracer.run(
+                                preprocessor.ast,
+                                globals=bindings,
+                                locals=bindings,
+                            )
+                        except exception.PyagramError as exc:
+                            raise exc
+                        except exception.CallWrapperInterruption as exc:
+                            interrupt_data.exempt_fn_locs.add(exc.location)
+                            continue
+                        except exception.UnsupportedOperatorException as exc:
+                            state.step()
+                            state.program_state.caught_exc_info = (
+                                type(exc),
+                                exc.message,
+                                state.program_state.curr_line_no,
+                            )
+                            state.step()
+                        except exception.BudgetExceededException as exc:
+                            if state.truncation is None:
+                                state.truncation = exc.message
+                        except Exception as exc:
+                            if state.truncation is None:
+                                terminal_ex = True
+                                assert state.program_state.curr_element.is_global_frame
+                                # TODO: You won't need terminal_ex if you don't take extraneous snapshots.
+                        else:
+                            if state.truncation is None:
+                                assert state.program_state.curr_element.is_global_frame
+                        self.truncation = state.truncation
+                        postprocessor = postprocess.Postprocessor(state, terminal_ex)
+                        postprocessor.postprocess()
+                        self.encoding = 'result'
+                        self.data = encode.encode_pyagram_result(state, postprocessor, delta=delta)
             except exception.PyagramError as exc:
                 self.encoding = 'error'
                 self.data = encode.encode_pyagram_error(exc)
             except Exception as exc:
-                sys.stdout = initial_stdout
                 if debug:
                     print(new_stdout.getvalue())
                     raise exc
                 pyagram_error = exception.PyagramError(constants.GENERIC_ERROR_MSG)
                 self.encoding = 'error'
                 self.data = encode.encode_pyagram_error(pyagram_error)
-            else:
-                sys.stdout = initial_stdout
             break
 
     def serialize(self):
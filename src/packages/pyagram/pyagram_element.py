@@ -10,10 +10,21 @@ class PyagramElement:
     """
     """
 
+    # A recursive program opens a great many elements, and each one stays in the tree for the whole
+    # trace, so elements keep their attributes in slots instead of in a __dict__ apiece.
+
+    __slots__ = (
+        'opened_by',
+        'state',
+        'flags',
+        'is_dirty',
+    )
+
     def __init__(self, opened_by, state):
         self.opened_by = opened_by
         self.state = opened_by.state if state is None else state
         self.flags = []
+        self.is_dirty = True
 
     def step(self):
         """
@@ -21,21 +32,53 @@ class PyagramElement:
         for flag in self.flags:
             flag.step()
 
+    def mark_dirty(self):
+        """
+        """
+
+        # The Encoder reuses the encoding of any element that is not dirty. An element's encoding
+        # includes the encodings of its flags and frame, so a change to an element also has to mark
+        # every element above it.
+
+        element = self
+        while element is not None:
+            element.is_dirty = True
+            element = element.opened_by
+
     def add_flag(self, pyagram_flag_type, banner_summary, **init_args):
         """
         """
         flag = PyagramFlag(self, pyagram_flag_type, banner_summary, **init_args)
         self.flags.append(flag)
+        self.mark_dirty()
         return flag
 
 class PyagramFlag(PyagramElement):
     """
     """
 
+    __slots__ = (
+        'flag_type',
+        'is_call_flag',
+        'is_comp_flag',
+        'code_col_offset',
+        'banner_elements',
+        'banner_bindings',
+        'hidden_snapshot',
+        'hide_flags',
+        'is_builtin',
+        'frame',
+    )
+
     def __init__(self, opened_by, flag_type, banner_summary, hidden_snapshot=math.inf, *, state=None):
         super().__init__(opened_by, state)
         # TODO: When you're done refactoring everything, see if you still need the infrastructure for hiding PyagramFlags, and whether you still need to postprocess each PyagramFlag. Also consider whether you need hide_flags -- or whether you'll must make it so that a hidden flag's subflags are hidden regardless.
         self.flag_type = flag_type
+
+        # A flag's type never changes, so these are checked once here, rather than on every step.
+
+        self.is_call_flag = flag_type is enum.PyagramFlagTypes.CALL
+        self.is_comp_flag = flag_type is enum.PyagramFlagTypes.COMP
         if banner_summary is None:
             # TODO: Use a constant equal to -1 for the code_col_offset, instead of None.
             code_col_offset, banner_elements = None, []
@@ -49,18 +92,6 @@ class PyagramFlag(PyagramElement):
         self.is_builtin = False
         self.frame = None
 
-    @property
-    def is_call_flag(self):
-        """
-        """
-        return self.flag_type is enum.PyagramFlagTypes.CALL
-
-    @property
-    def is_comp_flag(self):
-        """
-        """
-        return self.flag_type is enum.PyagramFlagTypes.COMP
-
     @property
     def banner_is_complete(self):
         """
@@ -95,6 +126,9 @@ class PyagramFlag(PyagramElement):
         """
         """
         self.hidden_snapshot = min(self.hidden_snapshot, snapshot_index)
+        self.mark_dirty()
+        if not self.is_hidden():
+            self.state.encoder.hiding_flags.append(self)
 
     def is_hidden(self, snapshot_index=None):
         """
@@ -150,7 +184,8 @@ class PyagramFlag(PyagramElement):
             binding_idx,
             unpacking_code,
         )
-        self.state.program_state.new_banners[self] = new_fn_code
+        self.mark_dirty()
+        self.state.program_state.new_banners[self] = self.state.encoder.intern_string(new_fn_code)
 
     def fix_implicit_banner(self, function, bindings):
         """
@@ -165,7 +200,8 @@ class PyagramFlag(PyagramElement):
             return binding_idx + 1
         args = []
         kwds = {}
-        for parameter in inspect.signature(function).parameters.values():
+        parameters, _, _, _ = self.state.memory_state.get_function_summary(function)
+        for parameter in parameters.values():
             if parameter.kind is inspect.Parameter.POSITIONAL_ONLY:
                 args.append(bindings[parameter.name])
             elif parameter.kind is inspect.Parameter.POSITIONAL_OR_KEYWORD:
@@ -184,6 +220,7 @@ class PyagramFlag(PyagramElement):
             num_bindings = add_banner_element('...', num_bindings, constants.SINGLY_UNPACKED_ARG)
         if 0 < len(kwds):
             num_bindings = add_banner_element('...', num_bindings, constants.DOUBLY_UNPACKED_ARG)
+        self.mark_dirty()
         self.state.step()
         self.register_callable(function)
         self.state.step()
@@ -200,6 +237,8 @@ class PyagramFlag(PyagramElement):
         """
         assert 0 == len(self.banner_bindings) < len(self.banner_elements)
         self.banner_bindings.append(callable)
+        self.mark_dirty()
+        self.state.memory_state.index_function(callable)
         if callable is help:
             raise exception.UnsupportedOperatorException('help')
         if callable is input:
@@ -211,9 +250,11 @@ class PyagramFlag(PyagramElement):
                 self.state.program_state.curr_line_no,
                 self.code_col_offset,
             )
-        if not inspect.isfunction(callable) \
-            or inspect.isgeneratorfunction(callable) \
-            or not utils.is_user_defined(callable):
+        if inspect.isfunction(callable):
+            _, _, is_gen_func, is_user_defined = self.state.memory_state.get_function_summary(callable)
+        else:
+            is_gen_func, is_user_defined = False, False
+        if is_gen_func or not is_user_defined:
 
             # BDB only exposes a frame for user-defined functions that aren't generator functions.
 
@@ -236,6 +277,7 @@ class PyagramFlag(PyagramElement):
         else:
             raise enum.UnpackingTypes.illegal_enum(unpacking_type)
         self.banner_bindings.append(binding)
+        self.mark_dirty()
 
     def add_frame(self, pyagram_frame_type, frame, **init_args):
         """
@@ -243,6 +285,7 @@ class PyagramFlag(PyagramElement):
         assert self.banner_is_complete
         frame = PyagramFrame(self, pyagram_frame_type, frame, **init_args)
         self.frame = frame
+        self.mark_dirty()
         return frame
 
     def close(self):
@@ -257,6 +300,27 @@ class PyagramFrame(PyagramElement):
     """
     """
 
+    __slots__ = (
+        'frame',
+        'function',
+        'generator',
+        'frame_type',
+        'is_global_frame',
+        'is_builtin_frame',
+        'is_function_frame',
+        'is_generator_frame',
+        'is_comprehension_frame',
+        'shows_bindings',
+        'shows_hidden_bindings',
+        'is_implicit',
+        'frame_number',
+        'yield_from',
+        'throws_exc',
+        'has_returned',
+        'return_value',
+        'bindings',
+    )
+
     def __init__(self, opened_by, frame_type, frame, is_implicit=False, *, state=None, function=None, generator=None):
         super().__init__(opened_by, state)
         self.frame = frame
@@ -270,6 +334,19 @@ class PyagramFrame(PyagramElement):
         else:
             assert function is None and generator is None
         self.frame_type = frame_type
+
+        # A frame's type never changes either, so neither does anything that only depends on it.
+
+        self.is_global_frame = frame_type is enum.PyagramFrameTypes.GLOBAL
+        self.is_builtin_frame = frame_type is enum.PyagramFrameTypes.BUILTIN
+        self.is_function_frame = frame_type is enum.PyagramFrameTypes.FUNCTION
+        self.is_generator_frame = frame_type is enum.PyagramFrameTypes.GENERATOR
+        self.is_comprehension_frame = frame_type is enum.PyagramFrameTypes.CNTNR_COMP
+        self.shows_bindings = self.is_global_frame \
+            or self.is_function_frame \
+            or self.is_generator_frame \
+            or self.is_comprehension_frame
+        self.shows_hidden_bindings = not (self.is_generator_frame or self.is_comprehension_frame)
         self.is_implicit = is_implicit
         if self.is_global_frame:
             del frame.f_globals['__builtins__']
@@ -288,6 +365,7 @@ class PyagramFrame(PyagramElement):
             raise enum.PyagramFrameTypes.illegal_enum(self.frame_type)
         self.has_returned = False
         self.return_value = None
+        self.bindings = None
 
     def __repr__(self):
         """
@@ -305,36 +383,6 @@ class PyagramFrame(PyagramElement):
         else:
             raise enum.PyagramFrameTypes.illegal_enum(self.frame_type)
 
-    @property
-    def is_global_frame(self):
-        """
-        """
-        return self.frame_type is enum.PyagramFrameTypes.GLOBAL
-
-    @property
-    def is_builtin_frame(self):
-        """
-        """
-        return self.frame_type is enum.PyagramFrameTypes.BUILTIN
-
-    @property
-    def is_function_frame(self):
-        """
-        """
-        return self.frame_type is enum.PyagramFrameTypes.FUNCTION
-
-    @property
-    def is_generator_frame(self):
-        """
-        """
-        return self.frame_type is enum.PyagramFrameTypes.GENERATOR
-
-    @property
-    def is_comprehension_frame(self):
-        """
-        """
-        return self.frame_type is enum.PyagramFrameTypes.CNTNR_COMP
-
     @property
     def parent(self):
         """
@@ -355,21 +403,6 @@ class PyagramFrame(PyagramElement):
         else:
             raise enum.PyagramFrameTypes.illegal_enum(self.frame_type)
 
-    @property
-    def shows_bindings(self):
-        """
-        """
-        return self.is_global_frame \
-            or self.is_function_frame \
-            or self.is_generator_frame \
-            or self.is_comprehension_frame
-
-    @property
-    def shows_hidden_bindings(self):
-        """
-        """
-        return not (self.is_generator_frame or self.is_comprehension_frame)
-
     @property
     def shows_return_value(self):
         """
@@ -408,7 +441,10 @@ class PyagramFrame(PyagramElement):
             if self.generator is not None:
                 referents.append(self.generator)
             if self.shows_bindings:
-                self.bindings = self.get_bindings()
+                bindings = self.get_bindings()
+                if not utils.is_same_mapping(self.bindings, bindings):
+                    self.bindings = bindings
+                    self.mark_dirty()
                 referents.extend(self.bindings.values())
             if self.shows_return_value:
                 referents.append(self.return_value)
@@ -421,24 +457,22 @@ class PyagramFrame(PyagramElement):
     def get_bindings(self):
         """
         """
-        sorted_binding_names = [] if self.function is None else list(
-            inspect.signature(self.function).parameters.keys(),
-        )
-        for variable, value in self.frame.f_locals.items():
-            is_in_parent_frame = False
-            next_frame_to_scan = self.parent
-            while next_frame_to_scan is not None:
-                if variable in next_frame_to_scan.frame.f_locals and next_frame_to_scan.frame.f_locals[variable] == value:
-                    is_in_parent_frame = True
-                    break
-                next_frame_to_scan = next_frame_to_scan.parent
-            if variable in self.frame.f_code.co_varnames or not is_in_parent_frame:
-                sorted_binding_names.append(variable)
-        return {
-            variable: self.frame.f_locals[variable]
-            for variable in sorted_binding_names
-            if self.shows_hidden_bindings or utils.is_genuine_binding(variable)
+        bindings = self.frame.f_locals
+        binding_names = self.state.memory_state.get_binding_names(self)
+        if binding_names is None:
+            return dict(bindings)
+        parameter_names, local_names = binding_names
+        sorted_bindings = {
+            variable: bindings[variable]
+            for variable in parameter_names
+            if variable in bindings
         }
+        sorted_bindings.update(
+            (variable, value)
+            for variable, value in bindings.items()
+            if variable in local_names
+        )
+        return sorted_bindings
 
     def close(self, return_value, *, is_gen_exc=False):
         """
@@ -448,5 +482,6 @@ class PyagramFrame(PyagramElement):
         if self.is_generator_frame:
             self.yield_from = self.generator.gi_yieldfrom
             self.throws_exc = is_gen_exc
+        self.mark_dirty()
         self.state.step()
         return self.opened_by
@@ -1,24 +1,46 @@
 import gc
 import inspect
+import sys
 
 from . import constants
 from . import encode
 from . import enum
+from . import exception
+from . import object_registry
 from . import pyagram_element
 from . import pyagram_wrapped_object
+from . import snapshot_policy
 from . import utils
 
 class State:
     """
     """
 
-    def __init__(self, preprocessor_summary, stdout, *, interrupt_data):
+    __slots__ = (
+        'program_state',
+        'memory_state',
+        'print_output',
+        'encoder',
+        'interrupt_data',
+        'snapshot_policy',
+        'snapshots',
+        'budget',
+        'num_trace_events',
+        'truncation',
+        'take_snapshot',
+    )
+
+    def __init__(self, preprocessor_summary, stdout, *, interrupt_data, policy=None, budget=None):
         self.program_state = None
         self.memory_state = MemoryState(self)
         self.print_output = stdout
         self.encoder = encode.Encoder(self, preprocessor_summary)
         self.interrupt_data = interrupt_data
+        self.snapshot_policy = snapshot_policy.VisibleEventPolicy() if policy is None else policy
         self.snapshots = []
+        self.budget = budget
+        self.num_trace_events = 0
+        self.truncation = None
 
     def step(self, *args):
         """
@@ -26,31 +48,36 @@ class State:
         if 0 == len(args):
             self.take_snapshot = True
         else:
-            self.take_snapshot = False
+            if self.truncation is not None:
+
+                # The user's code may have caught the BudgetExceededException and carried on.
+
+                raise exception.BudgetExceededException(self.truncation)
+            self.num_trace_events += 1
             if self.program_state is None:
                 frame, *_ = args
                 self.program_state = ProgramState(self, frame)
             self.program_state.process_trace_event(*args)
+            self.take_snapshot = self.snapshot_policy.takes_snapshot(
+                self.program_state.curr_trace_type,
+                self.program_state.curr_frame_type,
+            )
         self.program_state.step()
         self.memory_state.step()
-        # ------------------------------------------------------------------------------------------
-        # TODO: Only take a snapshot when appropriate!
-        # (*) Delete the next line.
-        # (*) Set `self.take_snapshot = True` elsewhere in this file (and maybe others).
-        # (*) PS: Right now it takes an eternity to run, since you're taking a million snapshots and then filtering out duplicates in postprocess.py.
-        # (*) Don't take the last snapshot where curr_elem is None.
-        self.take_snapshot = True
-        # TODO: Before working on this bit, comment out kill_static_snapshots in postprocess.py.
-        # ------------------------------------------------------------------------------------------
+        # TODO: Don't take the last snapshot where curr_elem is None.
         if self.take_snapshot:
             self.snapshot()
+        if 0 < len(args) and self.budget is not None:
+            self.truncation = self.budget.check(self)
+            if self.truncation is not None:
+                raise exception.BudgetExceededException(self.truncation)
 
     def snapshot(self):
         """
         """
         snapshot = {
             'memory_state': self.memory_state.snapshot(),
-            'print_output': self.print_output.getvalue(),
+            'print_output': self.print_output.tell(),
             **self.program_state.snapshot(),
         }
         self.snapshots.append(snapshot)
@@ -59,6 +86,21 @@ class ProgramState:
     """
     """
 
+    __slots__ = (
+        'state',
+        'global_frame',
+        'curr_element',
+        'curr_line_no',
+        'curr_trace_type',
+        'curr_frame_type',
+        'caught_exc_info',
+        'exception_index',
+        'new_banners',
+        'finish_prev',
+        'frame_types',
+        'frame_count',
+    )
+
     def __init__(self, state, global_frame):
         self.state = state
         self.global_frame = pyagram_element.PyagramFrame(
@@ -70,6 +112,7 @@ class ProgramState:
         self.curr_element = self.global_frame
         self.curr_line_no = 0
         self.curr_trace_type = None
+        self.curr_frame_type = None
         self.caught_exc_info = None
         self.new_banners = {}
         self.finish_prev = None
@@ -132,6 +175,7 @@ class ProgramState:
     def snapshot(self):
         """
         """
+        self.state.encoder.update_dirty_elements()
         return {
             'global_frame': self.state.encoder.encode_pyagram_frame(self.global_frame),
             'curr_line_no': self.curr_line_no,
@@ -153,6 +197,15 @@ class ProgramState:
         if frame not in self.frame_types:
             self.frame_types[frame] = enum.FrameTypes.identify_frame_type(step_code)
         frame_type = self.frame_types[frame]
+
+        # A frame's type comes from the line number of its first trace event. For the global frame,
+        # that is the first line of the program, which is in a wrapper if it has a call in it. But
+        # every line of the global frame is still user code, as far as snapshots are concerned.
+
+        if frame is self.global_frame.frame:
+            self.curr_frame_type = enum.FrameTypes.SRC_CALL
+        else:
+            self.curr_frame_type = frame_type
         if trace_type is enum.TraceTypes.USER_CALL:
             self.process_frame_open(frame, frame_type)
         elif trace_type is enum.TraceTypes.USER_LINE:
@@ -177,8 +230,8 @@ class ProgramState:
                 self.is_ongoing_flag_sans_frame
                 and not self.curr_element.banner_is_complete
             )
-            function = utils.get_function(frame)
-            generator = utils.get_generator(frame)
+            function = self.state.memory_state.get_function(frame)
+            generator = self.state.memory_state.get_generator(frame)
             if is_implicit:
                 self.open_pyagram_flag(enum.PyagramFlagTypes.CALL, None)
                 if function is None:
@@ -372,6 +425,25 @@ class MemoryState:
     """
     """
 
+    __slots__ = (
+        'state',
+        'objects',
+        'obj_ids',
+        'wrapped_obj_ids',
+        'pg_class_frames',
+        'pg_generator_frames',
+        'function_parents',
+        'code_functions',
+        'frame_generators',
+        'iterables',
+        'fingerprints',
+        'object_snapshots',
+        'object_sizes',
+        'heap_bytes',
+        'function_summaries',
+        'binding_names',
+    )
+
     def __init__(self, state):
         self.state = state
         self.objects = []
@@ -380,77 +452,215 @@ class MemoryState:
         self.pg_class_frames = {}
         self.pg_generator_frames = {}
         self.function_parents = {}
+        self.code_functions = {}
+        self.frame_generators = {}
+        self.iterables = {}
+        self.fingerprints = {}
+        self.object_snapshots = {}
+        self.object_sizes = {}
+        self.heap_bytes = 0
+        self.function_summaries = {}
+        self.binding_names = {}
 
     def step(self):
         """
         """
+
+        # An object whose fingerprint has not changed since the last step has the same referents as
+        # before, and those are tracked already. Its snapshot from before can be reused too.
+
         for object in self.objects:
-            object_type = enum.ObjectTypes.identify_tracked_object_type(object)
-            if object_type is enum.ObjectTypes.FUNCTION:
-                self.record_function(object)
-                referents = utils.get_defaults(object)
-            elif object_type is enum.ObjectTypes.METHOD:
-                function = object.__func__
-                instance = object.__self__
-                self.record_function(function)
-                referents = [
-                    function,
-                    *utils.get_defaults(function),
-                    instance,
-                ]
-            elif object_type is enum.ObjectTypes.BUILTIN:
-                if hasattr(object, '__self__') and not inspect.ismodule(object.__self__):
-                    referents = [object.__self__]
-                else:
-                    referents = []
-            elif object_type is enum.ObjectTypes.ORDERED_COLLECTION:
-                referents = list(object)
-            elif object_type is enum.ObjectTypes.UNORDERED_COLLECTION:
-                referents = list(object)
-            elif object_type is enum.ObjectTypes.MAPPING:
-                referents = [
-                    *object.keys(),
-                    *object.values(),
-                ]
-            elif object_type is enum.ObjectTypes.ITERATOR:
-                iterable = utils.get_iterable(object)
-                referents = [] if iterable is None else [iterable]
-            elif object_type is enum.ObjectTypes.GENERATOR:
-                referents = []
-            elif object_type is enum.ObjectTypes.USER_CLASS:
-                referents = object.bindings.values()
-            elif object_type is enum.ObjectTypes.BLTN_CLASS:
-                referents = []
-            elif object_type is enum.ObjectTypes.INSTANCE:
-                referents = [
-                    *object.__dict__.keys(),
-                    *object.__dict__.values(),
-                ]
-            elif object_type is enum.ObjectTypes.RANGE:
-                referents = [object.start, object.stop, object.step]
-            elif object_type is enum.ObjectTypes.SLICE:
-                referents = filter(
-                    lambda referent: referent is not None,
-                    [object.start, object.stop, object.step],
-                )
-            elif object_type is enum.ObjectTypes.OTHER:
-                referents = []
-            else:
-                raise enum.ObjectTypes.illegal_enum(object_type)
-            for referent in referents:
+            handler = object_registry.OBJECT_REGISTRY.get_handler(type(object))
+            fingerprint = handler.get_fingerprint(self, object)
+            if utils.is_same_fingerprint(self.fingerprints.get(id(object)), fingerprint):
+                continue
+            self.fingerprints[id(object)] = fingerprint
+            self.object_snapshots.pop(id(object), None)
+            object_size = handler.get_size(self, object)
+            self.heap_bytes += object_size - self.object_sizes.get(id(object), 0)
+            self.object_sizes[id(object)] = object_size
+            for referent in handler.get_referents(self, object):
                 self.track(referent)
 
     def snapshot(self):
         """
         """
         return [
-            {
+            self.snapshot_object(object)
+            for object in self.objects
+        ]
+
+    def snapshot_object(self, object):
+        """
+        """
+        object_snapshot = self.object_snapshots.get(id(object))
+        if object_snapshot is None:
+            object_snapshot = {
                 'id': id(object),
                 'object': self.state.encoder.encode_object(object),
             }
-            for object in self.objects
+            if self.fingerprints.get(id(object)) is not None:
+                self.object_snapshots[id(object)] = object_snapshot
+        return object_snapshot
+
+    # A fingerprint is a tuple of everything an object's referents and encoding depend on, or None
+    # if the object must be walked and encoded again at every step.
+    #
+    # Only containers count towards the size of the heap, since those are what can grow without
+    # bound. Their types are all built in, so sys.getsizeof runs no user code.
+
+    def get_function_fingerprint(self, object):
+        """
+        """
+        return (
+            object.__name__,
+            object.__code__,
+            object.__defaults__,
+            *utils.flatten_mapping(object.__kwdefaults__ or {}),
+        )
+
+    def get_collection_fingerprint(self, object):
+        """
+        """
+        return tuple(object)
+
+    def get_mapping_fingerprint(self, object):
+        """
+        """
+        return utils.flatten_mapping(object)
+
+    def get_iterator_fingerprint(self, object):
+        """
+        """
+        iterable = self.get_iterable(object)
+        return (None,) if iterable is None else (
+            iterable,
+            len(iterable),
+            object.__length_hint__(),
+        )
+
+    def get_user_class_fingerprint(self, object):
+        """
+        """
+        return (
+            object.class_obj,
+            *(() if object.class_obj is None else object.class_obj.__bases__),
+            *utils.flatten_mapping(object.bindings),
+        )
+
+    def get_bltn_class_fingerprint(self, object):
+        """
+        """
+        return (object.__name__, *object.__bases__)
+
+    def get_instance_fingerprint(self, object):
+        """
+        """
+        return (type(object), *utils.flatten_mapping(object.__dict__))
+
+    def get_constant_fingerprint(self, object):
+        """
+        """
+        return ()
+
+    def get_no_fingerprint(self, object):
+        """
+        """
+        return None
+
+    def get_function_referents(self, object):
+        """
+        """
+        self.record_function(object)
+        _, defaults, _, _ = self.get_function_summary(object)
+        return defaults
+
+    def get_method_referents(self, object):
+        """
+        """
+        function = object.__func__
+        instance = object.__self__
+        self.record_function(function)
+        _, defaults, _, _ = self.get_function_summary(function)
+        return [
+            function,
+            *defaults,
+            instance,
+        ]
+
+    def get_builtin_referents(self, object):
+        """
+        """
+        if hasattr(object, '__self__') and not inspect.ismodule(object.__self__):
+            return [object.__self__]
+        else:
+            return []
+
+    def get_collection_referents(self, object):
+        """
+        """
+        return list(object)
+
+    def get_mapping_referents(self, object):
+        """
+        """
+        return [
+            *object.keys(),
+            *object.values(),
         ]
 
+    def get_iterator_referents(self, object):
+        """
+        """
+        iterable = self.get_iterable(object)
+        return [] if iterable is None else [iterable]
+
+    def get_user_class_referents(self, object):
+        """
+        """
+        return object.bindings.values()
+
+    def get_instance_referents(self, object):
+        """
+        """
+        return [
+            *object.__dict__.keys(),
+            *object.__dict__.values(),
+        ]
+
+    def get_range_referents(self, object):
+        """
+        """
+        return [object.start, object.stop, object.step]
+
+    def get_slice_referents(self, object):
+        """
+        """
+        return filter(
+            lambda referent: referent is not None,
+            [object.start, object.stop, object.step],
+        )
+
+    def get_no_referents(self, object):
+        """
+        """
+        return []
+
+    def get_container_size(self, object):
+        """
+        """
+        return sys.getsizeof(object)
+
+    def get_instance_size(self, object):
+        """
+        """
+        return sys.getsizeof(object.__dict__)
+
+    def get_no_size(self, object):
+        """
+        """
+        return 0
+
     def track(self, object):
         """
         """
@@ -463,14 +673,22 @@ class MemoryState:
             elif reference_type is enum.ReferenceTypes.UNKNOWN:
                 pass
             elif reference_type is enum.ReferenceTypes.DEFAULT:
-                object_type = enum.ObjectTypes.identify_raw_object_type(object)
+                object_type = object_registry.OBJECT_REGISTRY.identify_object_type(object)
+
+                # The PyagramGeneratorFrame that wraps a generator is identified as a generator too,
+                # but it gets tracked like any other object.
+
                 if object_type is enum.ObjectTypes.PRIMITIVE:
                     pass
-                elif object_type is enum.ObjectTypes.GENERATOR:
+                elif inspect.isgenerator(object):
                     pyagram_wrapped_object.PyagramGeneratorFrame(object, state=self.state)
+                    if object.gi_frame is not None:
+                        self.frame_generators[object.gi_frame] = object
                 else:
                     self.objects.append(object)
                     self.obj_ids.add(id(object))
+                    if object_type is enum.ObjectTypes.ITERATOR:
+                        self.iterables[object] = utils.get_iterable(object)
             else:
                 raise enum.ReferenceTypes.illegal_enum(reference_type)
 
@@ -478,6 +696,8 @@ class MemoryState:
         """
         """
         self.wrapped_obj_ids[id(from_object)] = id(to_object)
+        self.object_snapshots.clear()
+        self.state.encoder.clear_element_encodings()
 
     def record_function(self, function):
         """
@@ -488,6 +708,111 @@ class MemoryState:
             while isinstance(parent, pyagram_element.PyagramFlag):
                 parent = parent.opened_by
             self.function_parents[function] = parent
+            self.index_function(function)
+
+    def index_function(self, callable):
+        """
+        """
+
+        # Remember which function a code object belongs to, so get_function can usually avoid
+        # scanning the heap with gc.get_referrers. Entries are keyed by id because code objects
+        # compare by value, and a code object made by utils.assign_unique_code_object is equal
+        # to the original.
+
+        object_type = object_registry.OBJECT_REGISTRY.identify_object_type(callable)
+        if object_type is enum.ObjectTypes.METHOD:
+            callable = callable.__func__
+            object_type = object_registry.OBJECT_REGISTRY.identify_object_type(callable)
+        if object_type is enum.ObjectTypes.FUNCTION:
+            self.code_functions[id(callable.__code__)] = callable
+
+    def get_function_summary(self, function):
+        """
+        """
+
+        # The same functions get inspected at every step, and inspect.signature is slow, so a
+        # function's summary (see utils.summarize_function) is reused for as long as its code,
+        # defaults and keyword defaults are the same objects. Functions made by the same def share
+        # a code object until utils.assign_unique_code_object runs, so entries are keyed by the code
+        # object, and still checked against the defaults of the function at hand.
+
+        code = function.__code__
+        defaults = function.__defaults__
+        kwdefaults = function.__kwdefaults__
+        entry = self.function_summaries.get(id(code))
+        if entry is None \
+            or entry[0] is not code \
+            or entry[1] is not defaults \
+            or entry[2] is not kwdefaults:
+            entry = (code, defaults, kwdefaults, utils.summarize_function(function))
+            self.function_summaries[id(code)] = entry
+        return entry[3]
+
+    def get_binding_names(self, pyagram_frame):
+        """
+        """
+
+        # A frame's bindings are the variables in its own scope, as the compiler worked them out: its
+        # parameters (in the order of the function's signature), then its other local variables and
+        # its cell variables (in the order they got bound). Its free variables belong to an enclosing
+        # frame, where they are drawn instead. These names are the same for every frame of the same
+        # code, so they are worked out once per code object. (The global frame's code is not
+        # optimized, so its scope is all of its f_locals, and this returns None for it. Class bodies
+        # are drawn by PyagramClassFrame.)
+
+        code = pyagram_frame.frame.f_code
+        if not code.co_flags & inspect.CO_OPTIMIZED:
+            return None
+        key = (id(code), pyagram_frame.function is None, pyagram_frame.shows_hidden_bindings)
+        entry = self.binding_names.get(key)
+        if entry is None or entry[0] is not code:
+            if pyagram_frame.function is None:
+                parameter_names = ()
+            else:
+                parameters, _, _, _ = self.get_function_summary(pyagram_frame.function)
+                parameter_names = tuple(parameters.keys())
+            local_names = frozenset(code.co_varnames + code.co_cellvars).difference(parameter_names)
+            if not pyagram_frame.shows_hidden_bindings:
+                parameter_names = tuple(filter(utils.is_genuine_binding, parameter_names))
+                local_names = frozenset(filter(utils.is_genuine_binding, local_names))
+            entry = (code, (parameter_names, local_names))
+            self.binding_names[key] = entry
+        return entry[1]
+
+    def get_function(self, frame):
+        """
+        """
+        function = self.code_functions.get(id(frame.f_code))
+        if function is None or function.__code__ is not frame.f_code:
+            function = utils.get_function(frame)
+            if function is not None:
+                self.code_functions[id(frame.f_code)] = function
+        return function
+
+    def get_generator(self, frame):
+        """
+        """
+        if not frame.f_code.co_flags & inspect.CO_GENERATOR:
+            return None
+        generator = self.frame_generators.get(frame)
+        if generator is None or generator.gi_frame is not frame:
+            generator = utils.get_generator(frame)
+            if generator is not None:
+                self.frame_generators[frame] = generator
+        return generator
+
+    def get_iterable(self, iterator):
+        """
+        """
+
+        # An iterator lets go of its iterable once it is exhausted. Its length hint drops to 0 as soon
+        # as it reaches the end, so only then is it worth checking whether it has done so.
+
+        iterable = self.iterables[iterator]
+        if iterable is not None and iterator.__length_hint__() == 0:
+            iterable = utils.get_iterable(iterator)
+            self.iterables[iterator] = iterable
+        return iterable
 
     def record_generator(self, pyagram_frame, generator):
         """
@@ -504,3 +829,182 @@ class MemoryState:
         pyagram_class_frame.wrap_object(class_object)
         pyagram_class_frame.class_obj = class_object
         pyagram_class_frame.initial_bases = self.state.encoder.encode_class_parents(class_object)
+
+# Every type of object is registered here with its handler, which holds what MemoryState and Encoder
+# do with it. See object_registry.ObjectRegistry.
+
+for object_types, handler in [
+    (
+        constants.PRIMITIVE_TYPES,
+        object_registry.ObjectHandler(enum.ObjectTypes.PRIMITIVE),
+    ),
+    (
+        constants.FUNCTION_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.FUNCTION,
+            get_fingerprint=MemoryState.get_function_fingerprint,
+            get_referents=MemoryState.get_function_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='function',
+            encode=encode.Encoder.encode_function,
+        ),
+    ),
+    (
+        constants.METHOD_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.METHOD,
+            get_fingerprint=MemoryState.get_constant_fingerprint,
+            get_referents=MemoryState.get_method_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='method',
+            encode=encode.Encoder.encode_method,
+        ),
+    ),
+    (
+        constants.BUILTIN_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.BUILTIN,
+            get_fingerprint=MemoryState.get_constant_fingerprint,
+            get_referents=MemoryState.get_builtin_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='builtin',
+            encode=encode.Encoder.encode_builtin,
+        ),
+    ),
+    (
+        constants.ORDERED_COLLECTION_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.ORDERED_COLLECTION,
+            get_fingerprint=MemoryState.get_collection_fingerprint,
+            get_referents=MemoryState.get_collection_referents,
+            get_size=MemoryState.get_container_size,
+            encoding='ordered_collection',
+            encode=encode.Encoder.encode_collection,
+        ),
+    ),
+    (
+        constants.UNORDERED_COLLECTION_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.UNORDERED_COLLECTION,
+            get_fingerprint=MemoryState.get_collection_fingerprint,
+            get_referents=MemoryState.get_collection_referents,
+            get_size=MemoryState.get_container_size,
+            encoding='unordered_collection',
+            encode=encode.Encoder.encode_collection,
+        ),
+    ),
+    (
+        constants.MAPPING_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.MAPPING,
+            get_fingerprint=MemoryState.get_mapping_fingerprint,
+            get_referents=MemoryState.get_mapping_referents,
+            get_size=MemoryState.get_container_size,
+            encoding='mapping',
+            encode=encode.Encoder.encode_mapping,
+        ),
+    ),
+    (
+        constants.ITERATOR_TYPES,
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.ITERATOR,
+            get_fingerprint=MemoryState.get_iterator_fingerprint,
+            get_referents=MemoryState.get_iterator_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='iterator',
+            encode=encode.Encoder.encode_iterator,
+        ),
+    ),
+    (
+        {*constants.GENERATOR_TYPES, pyagram_wrapped_object.PyagramGeneratorFrame},
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.GENERATOR,
+            get_fingerprint=MemoryState.get_no_fingerprint,
+            get_referents=MemoryState.get_no_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='generator',
+            encode=encode.Encoder.encode_generator,
+        ),
+    ),
+    (
+        {pyagram_wrapped_object.PyagramClassFrame},
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.USER_CLASS,
+            get_fingerprint=MemoryState.get_user_class_fingerprint,
+            get_referents=MemoryState.get_user_class_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='class',
+            encode=encode.Encoder.encode_user_class,
+        ),
+    ),
+    (
+        {type},
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.BLTN_CLASS,
+            get_fingerprint=MemoryState.get_bltn_class_fingerprint,
+            get_referents=MemoryState.get_no_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='class',
+            encode=encode.Encoder.encode_bltn_class,
+        ),
+    ),
+    (
+        {range},
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.RANGE,
+            get_fingerprint=MemoryState.get_constant_fingerprint,
+            get_referents=MemoryState.get_range_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='range',
+            encode=encode.Encoder.encode_range,
+        ),
+    ),
+    (
+        {slice},
+        object_registry.ObjectHandler(
+            enum.ObjectTypes.SLICE,
+            get_fingerprint=MemoryState.get_constant_fingerprint,
+            get_referents=MemoryState.get_slice_referents,
+            get_size=MemoryState.get_no_size,
+            encoding='slice',
+            encode=encode.Encoder.encode_slice,
+        ),
+    ),
+]:
+    object_registry.OBJECT_REGISTRY.register(object_types, handler)
+
+# Every namedtuple is its own subclass of tuple, so they are registered through tuple, for its
+# subclasses that are namedtuples. The rest of the types are drawn as instances if their instances
+# have a __dict__, and with their repr otherwise.
+
+object_registry.OBJECT_REGISTRY.register(
+    {tuple},
+    object_registry.OBJECT_REGISTRY.get_handler(tuple),
+    subclasses=True,
+    condition=utils.is_namedtuple_class,
+)
+object_registry.OBJECT_REGISTRY.register(
+    {object},
+    object_registry.ObjectHandler(
+        enum.ObjectTypes.INSTANCE,
+        get_fingerprint=MemoryState.get_instance_fingerprint,
+        get_referents=MemoryState.get_instance_referents,
+        get_size=MemoryState.get_instance_size,
+        encoding='instance',
+        encode=encode.Encoder.encode_instance,
+    ),
+    subclasses=True,
+    condition=utils.has_instance_dict,
+)
+object_registry.OBJECT_REGISTRY.register(
+    {object},
+    object_registry.ObjectHandler(
+        enum.ObjectTypes.OTHER,
+        get_fingerprint=MemoryState.get_no_fingerprint,
+        get_referents=MemoryState.get_no_referents,
+        get_size=MemoryState.get_no_size,
+        encoding='other',
+        encode=encode.Encoder.encode_other,
+    ),
+    subclasses=True,
+)
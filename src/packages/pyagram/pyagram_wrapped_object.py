@@ -1,11 +1,14 @@
 from . import enum
 from . import pyagram_element
-from . import utils
 
 class PyagramWrappedObject:
     """
     """
 
+    __slots__ = (
+        'state',
+    )
+
     def __init__(self, state):
         state.memory_state.track(self)
         self.state = state
@@ -19,12 +22,20 @@ class PyagramGeneratorFrame(PyagramWrappedObject):
     """
     """
 
+    __slots__ = (
+        'generator',
+        'number',
+        'parent',
+        'prev_frame',
+        'curr_frame',
+    )
+
     def __init__(self, generator, *, state):
         super().__init__(state)
         state.memory_state.pg_generator_frames[generator] = self
         self.generator = generator
         self.wrap_object(generator)
-        generator_function = utils.get_function(generator.gi_frame)
+        generator_function = state.memory_state.get_function(generator.gi_frame)
         if generator_function is None:
             parent = state.program_state.curr_element
             while isinstance(parent, pyagram_element.PyagramFlag):
@@ -56,6 +67,12 @@ class PyagramClassFrame(PyagramWrappedObject):
     """
     """
 
+    __slots__ = (
+        'frame',
+        'class_obj',
+        'initial_bases',
+    )
+
     HIDDEN_BINDINGS = {
         '__classcell__',
         '__dict__',
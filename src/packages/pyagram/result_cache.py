@@ -0,0 +1,161 @@
+import collections
+import hashlib
+import os
+import pathlib
+import sys
+import tempfile
+import threading
+
+def get_version_stamp():
+    """
+    """
+
+    # The results depend on the code of this package and on the Python version, so a change to
+    # either one invalidates every cached result.
+
+    version_hash = hashlib.sha256(sys.version.encode())
+    for path in sorted(pathlib.Path(__file__).parent.glob('*.py')):
+        version_hash.update(path.name.encode())
+        version_hash.update(path.read_bytes())
+    return version_hash.hexdigest()
+
+VERSION_STAMP = get_version_stamp()
+
+class ResultCache:
+    """
+    """
+
+    # A content-addressed cache of serialized results, keyed on a hash of the code, the options it
+    # was drawn with, and the version stamp. Recently used results are kept in memory. If a directory
+    # is given, results are also written there, and the least recently used files are deleted once
+    # they take up more than `max_disk_bytes`.
+
+    def __init__(self, *, max_entries, directory=None, max_disk_bytes=None):
+        self.max_entries = max_entries
+        self.directory = None if directory is None else pathlib.Path(directory)
+        self.max_disk_bytes = max_disk_bytes
+        self.entries = collections.OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if self.directory is not None:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def make_key(code, **options):
+        """
+        """
+        key_hash = hashlib.sha256(VERSION_STAMP.encode())
+        for option, value in sorted(options.items()):
+            key_hash.update(f'{option}={value!r};'.encode())
+        key_hash.update(normalize_code(code).encode())
+        return key_hash.hexdigest()
+
+    def get(self, key):
+        """
+        """
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        serialization = self.read_file(key)
+        with self.lock:
+            if serialization is None:
+                self.misses += 1
+            else:
+                self.disk_hits += 1
+                self.add_entry(key, serialization)
+        return serialization
+
+    def put(self, key, serialization):
+        """
+        """
+        with self.lock:
+            self.add_entry(key, serialization)
+        self.write_file(key, serialization)
+
+    def stats(self):
+        """
+        """
+        with self.lock:
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'entries': len(self.entries),
+            }
+
+    def add_entry(self, key, serialization):
+        """
+        """
+        self.entries[key] = serialization
+        self.entries.move_to_end(key)
+        while self.max_entries < len(self.entries):
+            self.entries.popitem(last=False)
+
+    def read_file(self, key):
+        """
+        """
+        if self.directory is None:
+            return None
+        path = self.directory / key
+        try:
+            serialization = path.read_bytes()
+            os.utime(path)
+        except OSError:
+            return None
+        return serialization
+
+    def write_file(self, key, serialization):
+        """
+        """
+
+        # Write to a temporary file first, so that another process never reads a partial result.
+
+        if self.directory is None:
+            return
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                file.write(serialization)
+            os.replace(temp_path, self.directory / key)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            return
+        self.evict_files()
+
+    def evict_files(self):
+        """
+        """
+        if self.max_disk_bytes is None:
+            return
+        files = []
+        for path in self.directory.iterdir():
+            if path.suffix == '.tmp':
+                continue
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        disk_bytes = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if disk_bytes <= self.max_disk_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            disk_bytes -= size
+
+def normalize_code(code):
+    """
+    """
+
+    # Only normalize what cannot change the result: line endings, and whitespace at the end of the
+    # code. Whitespace elsewhere may be inside a string literal.
+
+    return code.replace('\r\n', '\n').replace('\r', '\n').rstrip() + '\n'
@@ -0,0 +1,53 @@
+import collections
+import secrets
+import threading
+import time
+
+class SessionStore:
+    """
+    """
+
+    # A bounded, in-process store of pyagram results, so the client can fetch the snapshots it needs
+    # a page at a time. Once the store is full, adding a session evicts the least recently used one.
+    # A session also expires if it has not been used for `ttl` seconds.
+
+    def __init__(self, *, max_sessions, ttl):
+        self.max_sessions = max_sessions
+        self.ttl = ttl
+        self.sessions = collections.OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, result):
+        """
+        """
+        session_id = secrets.token_urlsafe(16)
+        with self.lock:
+            self.evict_expired_sessions()
+            self.sessions[session_id] = (result, time.monotonic())
+            while self.max_sessions < len(self.sessions):
+                self.sessions.popitem(last=False)
+        return session_id
+
+    def get(self, session_id):
+        """
+        """
+        with self.lock:
+            self.evict_expired_sessions()
+            if session_id not in self.sessions:
+                return None
+            result, _ = self.sessions.pop(session_id)
+            self.sessions[session_id] = (result, time.monotonic())
+            return result
+
+    def evict_expired_sessions(self):
+        """
+        """
+
+        # The sessions are in order of last use, so the expired ones are all at the front.
+
+        now = time.monotonic()
+        while 0 < len(self.sessions):
+            _, (_, last_used) = next(iter(self.sessions.items()))
+            if now - last_used < self.ttl:
+                break
+            self.sessions.popitem(last=False)
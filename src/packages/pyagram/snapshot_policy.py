@@ -0,0 +1,58 @@
+from . import enum
+
+class EveryEventPolicy:
+    """
+    """
+
+    # Take a snapshot upon every trace event, and leave it to the Postprocessor to discard the ones
+    # that do not differ from their predecessors. This is slower than VisibleEventPolicy, but it
+    # draws the same diagram, so it serves as a reference to compare VisibleEventPolicy against.
+
+    def takes_snapshot(self, trace_type, frame_type):
+        """
+        """
+        return True
+
+class VisibleEventPolicy:
+    """
+    """
+
+    # Only take a snapshot upon a trace event that can change what the diagram shows: a new line in
+    # a frame of user code, a frame opening or closing, a banner binding getting registered, or an
+    # exception. The lambdas inserted by the preprocessor do nothing visible when they start running.
+
+    def takes_snapshot(self, trace_type, frame_type):
+        """
+        """
+        if trace_type is enum.TraceTypes.USER_CALL:
+            return self.is_user_code(frame_type)
+        elif trace_type is enum.TraceTypes.USER_LINE:
+            return self.is_user_code(frame_type)
+        elif trace_type is enum.TraceTypes.USER_RETURN:
+            return True
+        elif trace_type is enum.TraceTypes.USER_EXCEPTION:
+            return True
+        else:
+            raise enum.TraceTypes.illegal_enum(trace_type)
+
+    def is_user_code(self, frame_type):
+        """
+        """
+        if frame_type is enum.FrameTypes.SRC_CALL:
+            return True
+        elif frame_type is enum.FrameTypes.CALL_BANNER:
+            return False
+        elif frame_type is enum.FrameTypes.COMP_BANNER:
+            return False
+        elif frame_type is enum.FrameTypes.FN_WRAPPER:
+            return False
+        elif frame_type is enum.FrameTypes.RG_WRAPPER:
+            return False
+        elif frame_type is enum.FrameTypes.PG_WRAPPER:
+            return False
+        elif frame_type is enum.FrameTypes.CLASS_DEFN:
+            return True
+        elif frame_type is enum.FrameTypes.CNTNR_COMP:
+            return True
+        else:
+            raise enum.FrameTypes.illegal_enum(frame_type)
@@ -0,0 +1,69 @@
+import contextlib
+import io
+import sys
+import threading
+
+INSTALL_LOCK = threading.Lock()
+
+class StdoutProxy(threading.local):
+    """
+    """
+
+    # A stand-in for sys.stdout, which forwards everything to the stream captured in the current
+    # thread, or else to the original stdout. The write and flush methods of the captured stream are
+    # stored directly in the thread's attributes, so that print runs no Python code of ours (which
+    # would otherwise get traced as part of the user's program).
+
+    # Each snapshot records how much print output there was so far, as an offset into the captured
+    # stream (see State.snapshot). Seeking or truncating the stream would make those offsets wrong,
+    # so the proxy refuses to, like a stream that cannot seek.
+
+    initial_stdout = None
+
+    def __getattr__(self, name):
+        return getattr(self.__dict__.get('stream', self.initial_stdout), name)
+
+    def seekable(self):
+        """
+        """
+        return False
+
+    def seek(self, *args):
+        """
+        """
+        raise io.UnsupportedOperation('seek')
+
+    def truncate(self, *args):
+        """
+        """
+        raise io.UnsupportedOperation('truncate')
+
+def install_stdout_proxy():
+    """
+    """
+    with INSTALL_LOCK:
+        if not isinstance(sys.stdout, StdoutProxy):
+            StdoutProxy.initial_stdout = sys.stdout
+            sys.stdout = StdoutProxy()
+        return sys.stdout
+
+@contextlib.contextmanager
+def capture_stdout(stream):
+    """
+    """
+
+    # sys.stdout is only ever replaced once, with a StdoutProxy. After that, capturing print output
+    # only changes the proxy's attributes in the current thread, so it never affects other threads.
+
+    proxy = install_stdout_proxy()
+    previous_attributes = dict(proxy.__dict__)
+    proxy.__dict__.update({
+        'stream': stream,
+        'write': stream.write,
+        'flush': stream.flush,
+    })
+    try:
+        yield stream
+    finally:
+        proxy.__dict__.clear()
+        proxy.__dict__.update(previous_attributes)
@@ -1,11 +1,14 @@
 import gc
 import inspect
+import itertools
 import math
+import operator
 import re
 import types
 
 from . import constants
 from . import enum
+from . import object_registry
 
 def pair_naturals(x, y, *, max_x):
     """
@@ -43,7 +46,7 @@ def get_function(frame):
     for referrer in gc.get_referrers(frame.f_code):
         # TODO: What about slot wrappers and other atypical callables?
         # TODO: Bound methods (i.e. ObjectTypes.METHOD) don't contain a ref to the code. They refer to the function (via .__func__), which refers to the code. If a bound method opens a frame, this will return the .__func__ of that bound method -- which should be fine.
-        if enum.ObjectTypes.identify_raw_object_type(referrer) is enum.ObjectTypes.FUNCTION:
+        if object_registry.OBJECT_REGISTRY.identify_object_type(referrer) is enum.ObjectTypes.FUNCTION:
             assert function is None, f'multiple functions refer to code object {frame.f_code}'
             function = referrer
     return function
@@ -63,15 +66,25 @@ def assign_unique_code_object(function):
     """
     function.__code__ = function.__code__.replace()
 
-def get_defaults(function):
+def summarize_function(function):
     """
     """
-    parameters = inspect.signature(function).parameters.values()
-    return [
-        parameter.default
-        for parameter in parameters
-        if parameter.default is not inspect.Parameter.empty
-    ]
+
+    # Return a tuple of a function's parameters (a mapping from their names to inspect.Parameter
+    # objects), its default values, whether it is a generator function, and whether it is defined in
+    # the user's code. See MemoryState.get_function_summary, which caches these.
+
+    parameters = inspect.signature(function).parameters
+    return (
+        parameters,
+        [
+            parameter.default
+            for parameter in parameters.values()
+            if parameter.default is not inspect.Parameter.empty
+        ],
+        inspect.isgeneratorfunction(function),
+        is_user_defined(function),
+    )
 
 def get_iterable(iterator):
     """
@@ -83,6 +96,40 @@ def get_iterable(iterator):
             iterable = referent
     return iterable
 
+def is_same_mapping(old_mapping, new_mapping):
+    """
+    """
+
+    # Values are compared by identity, so two mappings are the same only if they would encode the
+    # same way. Primitives are immutable, and anything else encodes as a reference to its ID.
+
+    return old_mapping is not None \
+        and len(old_mapping) == len(new_mapping) \
+        and all(
+            old_key == new_key and old_value is new_value
+            for (old_key, old_value), (new_key, new_value) in zip(
+                old_mapping.items(),
+                new_mapping.items(),
+            )
+        )
+
+def flatten_mapping(mapping):
+    """
+    """
+    return tuple(itertools.chain.from_iterable(mapping.items()))
+
+def is_same_fingerprint(old_fingerprint, new_fingerprint):
+    """
+    """
+
+    # Like in is_same_mapping, everything is compared by identity. A fingerprint holds references
+    # to the objects in it, so none of them can get garbage-collected and have its ID reused.
+
+    return old_fingerprint is not None \
+        and new_fingerprint is not None \
+        and len(old_fingerprint) == len(new_fingerprint) \
+        and all(map(operator.is_, old_fingerprint, new_fingerprint))
+
 def is_user_defined(function):
     """
     """
@@ -92,6 +139,16 @@ def is_user_defined(function):
     except TypeError:
         return False
 
+def is_namedtuple_class(object_type):
+    """
+    """
+    return object_type.__bases__ == (tuple,) and '_fields' in object_type.__dict__
+
+def has_instance_dict(object_type):
+    """
+    """
+    return object_type.__dictoffset__ != 0
+
 def is_genuine_binding(variable):
     """
     """
@@ -0,0 +1,325 @@
+import collections
+import concurrent.futures
+import multiprocessing
+import multiprocessing.connection
+import multiprocessing.reduction
+import os
+import queue
+import resource
+import signal
+import threading
+import time
+
+class WorkerError(Exception):
+    """
+    """
+
+    pass
+
+class WorkerPool:
+    """
+    """
+
+    # A pool of worker processes which run `function` in isolation from the web server. Workers are
+    # forked from a server process that has already imported the pyagram package, and each one is
+    # started ahead of time. A worker is recycled after `max_jobs_per_worker` jobs or once its peak
+    # RSS exceeds `max_rss_bytes`, and killed if a job takes longer than `timeout` seconds. At most
+    # `max_queue` jobs may wait for a worker; past that, submit raises queue.Full.
+    #
+    # If `fork_per_job` is set, every job instead runs in a fresh child forked from a zygote process,
+    # so no state carries over from one job to the next. Then `num_workers` is the most children that
+    # may run at once.
+
+    def __init__(
+        self,
+        function,
+        *,
+        num_workers,
+        max_queue,
+        max_jobs_per_worker,
+        max_rss_bytes,
+        timeout,
+        fork_per_job=False,
+    ):
+        self.function = function
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.max_rss_bytes = max_rss_bytes
+        self.timeout = timeout
+        self.context = multiprocessing.get_context('forkserver')
+        self.context.set_forkserver_preload(['src.packages.pyagram.pyagram'])
+        self.jobs = queue.Queue(maxsize=max_queue)
+        self.lock = threading.Lock()
+        self.zygote = Zygote(self.context, function) if fork_per_job else None
+        self.counts = collections.Counter()
+        self.job_seconds = 0
+        self.start_time = time.monotonic()
+        self.dispatchers = [
+            threading.Thread(target=self.dispatch, daemon=True)
+            for _ in range(num_workers)
+        ]
+        for dispatcher in self.dispatchers:
+            dispatcher.start()
+
+    def submit(self, *args):
+        """
+        """
+        future = concurrent.futures.Future()
+        try:
+            self.jobs.put_nowait((future, args))
+        except queue.Full:
+            self.count('rejected')
+            raise
+        self.count('submitted')
+        return future
+
+    def shutdown(self):
+        """
+        """
+        for _ in self.dispatchers:
+            self.jobs.put(None)
+        for dispatcher in self.dispatchers:
+            dispatcher.join()
+        if self.zygote is not None:
+            self.zygote.stop()
+
+    def stats(self):
+        """
+        """
+        with self.lock:
+            num_finished = self.counts['completed'] + self.counts['failed'] + self.counts['timed_out']
+            return {
+                'workers': len(self.dispatchers),
+                'queued': self.jobs.qsize(),
+                **{
+                    key: self.counts[key]
+                    for key in ['submitted', 'rejected', 'completed', 'failed', 'timed_out', 'recycled']
+                },
+                'mean_job_seconds': self.job_seconds / num_finished if 0 < num_finished else None,
+                'jobs_per_second': num_finished / (time.monotonic() - self.start_time),
+            }
+
+    def count(self, key, job_seconds=0):
+        """
+        """
+        with self.lock:
+            self.counts[key] += 1
+            self.job_seconds += job_seconds
+
+    def make_worker(self):
+        """
+        """
+        if self.zygote is None:
+            return Worker(self.context, self.function)
+        else:
+            return ForkedWorker(self.get_zygote)
+
+    def get_zygote(self):
+        """
+        """
+        with self.lock:
+            if not self.zygote.process.is_alive():
+                self.zygote.stop()
+                self.zygote = Zygote(self.context, self.function)
+            return self.zygote
+
+    def dispatch(self):
+        """
+        """
+
+        # Each dispatcher thread owns one worker, and feeds it one job at a time from the queue.
+
+        worker = self.make_worker()
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                worker.stop()
+                return
+            future, args = job
+            if not future.set_running_or_notify_cancel():
+                continue
+            start_time = time.monotonic()
+            try:
+                is_success, value, rss_bytes = worker.run(args, timeout=self.timeout)
+            except concurrent.futures.TimeoutError as exc:
+                worker.kill()
+                worker = self.make_worker()
+                self.count('timed_out', time.monotonic() - start_time)
+                future.set_exception(exc)
+                continue
+            except (EOFError, OSError) as exc:
+                worker.kill()
+                worker = self.make_worker()
+                self.count('failed', time.monotonic() - start_time)
+                future.set_exception(WorkerError(f'the worker process died: {exc!r}'))
+                continue
+            if is_success:
+                self.count('completed', time.monotonic() - start_time)
+                future.set_result(value)
+            else:
+                self.count('failed', time.monotonic() - start_time)
+                future.set_exception(WorkerError(value))
+            if self.zygote is not None:
+                continue
+            if self.max_jobs_per_worker <= worker.num_jobs or self.max_rss_bytes < rss_bytes:
+                worker.stop()
+                worker = self.make_worker()
+                self.count('recycled')
+
+class Worker:
+    """
+    """
+
+    def __init__(self, context, function):
+        self.connection, worker_connection = context.Pipe()
+        self.process = context.Process(
+            target=run_worker,
+            args=(function, worker_connection),
+            daemon=True,
+        )
+        self.process.start()
+        worker_connection.close()
+        self.num_jobs = 0
+
+    def run(self, args, *, timeout):
+        """
+        """
+        self.num_jobs += 1
+        self.connection.send(args)
+        if not self.connection.poll(timeout):
+            raise concurrent.futures.TimeoutError(f'the job took longer than {timeout} seconds')
+        return self.connection.recv()
+
+    def stop(self):
+        """
+        """
+        self.connection.close()
+        self.process.join()
+
+    def kill(self):
+        """
+        """
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+class Zygote:
+    """
+    """
+
+    # Forking from a process which has already imported everything a job needs is much faster than
+    # starting a process from scratch, and the fork shares that process's memory copy-on-write.
+
+    def __init__(self, context, function):
+        self.connection, zygote_connection = context.Pipe()
+        self.process = context.Process(
+            target=run_zygote,
+            args=(function, zygote_connection),
+            daemon=True,
+        )
+        self.process.start()
+        zygote_connection.close()
+        self.lock = threading.Lock()
+
+    def fork(self):
+        """
+        """
+
+        # The zygote gets one end of a fresh pipe, and hands it down to the child it forks. Return the
+        # child's PID and the other end of the pipe.
+
+        connection, child_connection = multiprocessing.Pipe()
+        try:
+            with self.lock:
+                multiprocessing.reduction.send_handle(
+                    self.connection,
+                    child_connection.fileno(),
+                    self.process.pid,
+                )
+                pid = self.connection.recv()
+        except BaseException:
+            connection.close()
+            raise
+        finally:
+            child_connection.close()
+        return pid, connection
+
+    def stop(self):
+        """
+        """
+        self.connection.close()
+        self.process.join()
+
+class ForkedWorker:
+    """
+    """
+
+    def __init__(self, get_zygote):
+        self.get_zygote = get_zygote
+        self.pid = None
+        self.num_jobs = 0
+
+    def run(self, args, *, timeout):
+        """
+        """
+        self.num_jobs += 1
+        self.pid, connection = self.get_zygote().fork()
+        with connection:
+            connection.send(args)
+            if not connection.poll(timeout):
+                raise concurrent.futures.TimeoutError(f'the job took longer than {timeout} seconds')
+            return connection.recv()
+
+    def stop(self):
+        """
+        """
+        pass
+
+    def kill(self):
+        """
+        """
+        if self.pid is not None:
+            try:
+                os.kill(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+def run_zygote(function, connection):
+    """
+    """
+
+    # Children are reaped automatically, since the zygote never waits on them.
+
+    signal.signal(signal.SIGCHLD, signal.SIG_IGN)
+    while True:
+        try:
+            fd = multiprocessing.reduction.recv_handle(connection)
+        except EOFError:
+            return
+        pid = os.fork()
+        if pid == 0:
+            try:
+                connection.close()
+                signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+                run_worker(function, multiprocessing.connection.Connection(fd))
+            finally:
+                os._exit(0)
+        os.close(fd)
+        connection.send(pid)
+
+def run_worker(function, connection):
+    """
+    """
+    while True:
+        try:
+            args = connection.recv()
+        except EOFError:
+            return
+        try:
+            is_success, value = True, function(*args)
+        except Exception as exc:
+            is_success, value = False, repr(exc)
+
+        # ru_maxrss is the peak RSS in kilobytes (on Linux).
+
+        rss_bytes = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+        connection.send((is_success, value, rss_bytes))
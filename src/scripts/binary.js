@@ -0,0 +1,163 @@
+export const MIMETYPE = 'application/x-msgpack';
+
+const SHAPE_REFERENCE_EXT = 1;
+const SHAPE_DEFINITION_EXT = 2;
+
+export function unpack(arrayBuffer) {
+    // Unpack the MessagePack bytes made by binary_encoding.py. A dict is sent either as a map, or as
+    // a shape (the sequence of its keys) followed by its values in order.
+    var view = new DataView(arrayBuffer);
+    var bytes = new Uint8Array(arrayBuffer);
+    var textDecoder = new TextDecoder();
+    var shapes = [];
+    var offset = 0;
+    function readStr(length) {
+        var string = textDecoder.decode(bytes.subarray(offset, offset + length));
+        offset += length;
+        return string;
+    }
+    function readArray(length) {
+        var array = new Array(length);
+        for (var i = 0; i < length; i++) {
+            array[i] = readValue();
+        }
+        return array;
+    }
+    function readMap(length) {
+        var map = {};
+        for (var i = 0; i < length; i++) {
+            var key = readValue();
+            map[key] = readValue();
+        }
+        return map;
+    }
+    function readRecord(shape) {
+        var record = {};
+        for (var i = 0; i < shape.length; i++) {
+            record[shape[i]] = readValue();
+        }
+        return record;
+    }
+    function readExt(extType, shapeIndex) {
+        switch (extType) {
+            case SHAPE_REFERENCE_EXT:
+                return readRecord(shapes[shapeIndex]);
+            case SHAPE_DEFINITION_EXT:
+                shapes[shapeIndex] = readValue();
+                return readRecord(shapes[shapeIndex]);
+            default:
+                throw new Error(`Unknown extension type ${extType}`);
+        }
+    }
+    function readValue() {
+        var code = bytes[offset];
+        offset += 1;
+        var value;
+        if (code < 0x80) {
+            return code;
+        } else if (code < 0x90) {
+            return readMap(code & 0x0f);
+        } else if (code < 0xa0) {
+            return readArray(code & 0x0f);
+        } else if (code < 0xc0) {
+            return readStr(code & 0x1f);
+        } else if (code >= 0xe0) {
+            return code - 0x100;
+        }
+        switch (code) {
+            case 0xc0:
+                return null;
+            case 0xc2:
+                return false;
+            case 0xc3:
+                return true;
+            case 0xcb:
+                value = view.getFloat64(offset);
+                offset += 8;
+                return value;
+            case 0xcc:
+                value = bytes[offset];
+                offset += 1;
+                return value;
+            case 0xcd:
+                value = view.getUint16(offset);
+                offset += 2;
+                return value;
+            case 0xce:
+                value = view.getUint32(offset);
+                offset += 4;
+                return value;
+            case 0xcf:
+                // Object IDs take up to 64 bits, but they are always below 2 ** 53 in practice.
+                value = view.getUint32(offset) * 2 ** 32 + view.getUint32(offset + 4);
+                offset += 8;
+                return value;
+            case 0xd0:
+                value = view.getInt8(offset);
+                offset += 1;
+                return value;
+            case 0xd1:
+                value = view.getInt16(offset);
+                offset += 2;
+                return value;
+            case 0xd2:
+                value = view.getInt32(offset);
+                offset += 4;
+                return value;
+            case 0xd3:
+                value = view.getInt32(offset) * 2 ** 32 + view.getUint32(offset + 4);
+                offset += 8;
+                return value;
+            case 0xd4:
+                offset += 2;
+                return readExt(bytes[offset - 2], bytes[offset - 1]);
+            case 0xd5:
+                offset += 3;
+                return readExt(bytes[offset - 3], view.getUint16(offset - 2));
+            case 0xd9:
+                offset += 1;
+                return readStr(bytes[offset - 1]);
+            case 0xda:
+                offset += 2;
+                return readStr(view.getUint16(offset - 2));
+            case 0xdb:
+                offset += 4;
+                return readStr(view.getUint32(offset - 4));
+            case 0xdc:
+                offset += 2;
+                return readArray(view.getUint16(offset - 2));
+            case 0xdd:
+                offset += 4;
+                return readArray(view.getUint32(offset - 4));
+            case 0xde:
+                offset += 2;
+                return readMap(view.getUint16(offset - 2));
+            case 0xdf:
+                offset += 4;
+                return readMap(view.getUint32(offset - 4));
+            default:
+                throw new Error(`Unknown MessagePack type 0x${code.toString(16)}`);
+        }
+    }
+    return readValue();
+}
+
+export function request(url, data) {
+    // GET the URL, preferring a binary response to a JSON one. On failure, reject with an object
+    // that has the status and decoded body, like the responseJSON of a failed $.ajax request.
+    var query = new URLSearchParams(data).toString();
+    return fetch(`${url}?${query}`, {
+        'headers': {'Accept': `${MIMETYPE}, application/json;q=0.9`},
+    }).then(function(response) {
+        return response.arrayBuffer().then(function(arrayBuffer) {
+            var contentType = response.headers.get('Content-Type') || '';
+            var body = contentType.startsWith(MIMETYPE)
+                ? unpack(arrayBuffer)
+                : JSON.parse(new TextDecoder().decode(arrayBuffer));
+            if (!response.ok) {
+                throw {'status': response.status, 'responseJSON': body};
+            }
+            return body;
+        });
+    });
+}
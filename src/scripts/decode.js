@@ -1,6 +1,12 @@
 import * as Templates from './templates.js';
 
 var objNumbers;
+var printOutput;
+var printOutputChars;
+var strings;
+var resolvedElements = new WeakMap();
+
+const INTERNED_KEYS = new Set(['name', 'parent', 'code']);
 
 var splitView;
 var completedFlags;
@@ -9,17 +15,104 @@ var oldObjects;
 Handlebars.registerHelper('decodeSnapshot', decodeSnapshot);
 export function decodeSnapshot(pyagramSnapshot, globalData, visOptions) {
     objNumbers = globalData.obj_numbers;
+    if (strings !== globalData.strings) {
+        strings = globalData.strings;
+        resolvedElements = new WeakMap();
+    }
+    if (printOutput !== globalData.print_output) {
+        // The offsets count code points, like Python does, whereas JS strings count UTF-16 code
+        // units. They only differ if the output has a surrogate pair in it.
+        printOutput = globalData.print_output;
+        printOutputChars = /[\uD800-\uDFFF]/.test(printOutput) ? Array.from(printOutput) : undefined;
+    }
     splitView = visOptions.splitView.checked;
     completedFlags = visOptions.completedFlags.checked;
     oldObjects = visOptions.oldObjects.checked;
+    pyagramSnapshot = resolveStrings(pyagramSnapshot);
     return {
         'stackHTML': decodeStackSnapshot(pyagramSnapshot.global_frame),
         'heapHTML': decodeHeapSnapshot(pyagramSnapshot.memory_state),
-        'exceptionHTML': decodeExceptionSnapshot(pyagramSnapshot.exception),
-        'printOutputHTML': decodePrintOutputSnapshot(pyagramSnapshot.print_output),
+        'exceptionHTML':
+            decodeTruncationNotice(globalData.truncated)
+            + decodeExceptionSnapshot(pyagramSnapshot.exception),
+        'printOutputHTML': decodePrintOutputSnapshot(slicePrintOutput(pyagramSnapshot.print_output)),
     };
 }
 
+export function decodeSnapshotDelta(prevSnapshot, snapshotDelta) {
+    // Apply a patch produced by encode_delta in encode.py. Unchanged parts of the previous snapshot
+    // are shared, not copied, so neither snapshot may be mutated afterwards.
+    if (snapshotDelta === null) {
+        return prevSnapshot;
+    } else if ('v' in snapshotDelta) {
+        return snapshotDelta.v;
+    } else if ('a' in snapshotDelta) {
+        return prevSnapshot.concat(snapshotDelta.a);
+    } else if ('d' in snapshotDelta) {
+        var snapshot = Object.assign({}, prevSnapshot);
+        Object.keys(snapshotDelta.d).forEach(function(key) {
+            snapshot[key] = decodeSnapshotDelta(prevSnapshot[key], snapshotDelta.d[key]);
+        });
+        return snapshot;
+    } else {
+        var snapshot = prevSnapshot.slice(0, snapshotDelta.l);
+        Object.keys(snapshotDelta.i).forEach(function(index) {
+            snapshot[index] = decodeSnapshotDelta(prevSnapshot[index], snapshotDelta.i[index]);
+        });
+        return snapshot;
+    }
+}
+
+function resolveStrings(element) {
+    // Replace the indices into the string table (see intern_string in encode.py) with the strings
+    // themselves. Snapshots share their unchanged parts, so each part is only resolved once. The keys
+    // of an instance's bindings are never interned, since some of them may be object IDs.
+    if (element === null || typeof element !== 'object') {
+        return element;
+    }
+    var resolvedElement = resolvedElements.get(element);
+    if (resolvedElement === undefined) {
+        if (Array.isArray(element)) {
+            resolvedElement = element.map(resolveStrings);
+        } else {
+            resolvedElement = {};
+            Object.keys(element).forEach(function(key) {
+                var value = element[key];
+                if (INTERNED_KEYS.has(key)) {
+                    resolvedElement[key] = resolveString(value);
+                } else if (key === 'parents' && Array.isArray(value)) {
+                    resolvedElement[key] = value.map(resolveString);
+                } else if (key === 'bindings' && Array.isArray(value) && element.type !== 'instance') {
+                    resolvedElement[key] = value.map(resolveBinding);
+                } else {
+                    resolvedElement[key] = resolveStrings(value);
+                }
+            });
+        }
+        resolvedElements.set(element, resolvedElement);
+    }
+    return resolvedElement;
+}
+
+function resolveString(string) {
+    return typeof string === 'number' ? strings[string] : string;
+}
+
+function resolveBinding(binding) {
+    return typeof binding.key === 'number'
+        ? {'key': resolveString(binding.key), 'value': binding.value}
+        : binding;
+}
+
+function slicePrintOutput(printOutputOffset) {
+    // Each snapshot only stores how much of the program's output had been printed by then.
+    if (printOutputChars === undefined) {
+        return printOutput.substring(0, printOutputOffset);
+    } else {
+        return printOutputChars.slice(0, printOutputOffset).join('');
+    }
+}
+
 Handlebars.registerHelper('decodeStackSnapshot', decodeStackSnapshot);
 export function decodeStackSnapshot(stackSnapshot) {
     return Templates.STACK_TEMPLATE(stackSnapshot);
@@ -118,6 +211,12 @@ export function decodeExceptionSnapshot(exceptionSnapshot) {
     return Templates.EXCEPTION_TEMPLATE(exceptionSnapshot);
 }
 
+Handlebars.registerHelper('decodeTruncationNotice', decodeTruncationNotice);
+export function decodeTruncationNotice(truncationMessage) {
+    // If the pyagram ran out of budget, say so on every snapshot, since none of them show the end.
+    return Templates.TRUNCATION_TEMPLATE(truncationMessage);
+}
+
 Handlebars.registerHelper('decodePrintOutputSnapshot', decodePrintOutputSnapshot);
 export function decodePrintOutputSnapshot(printOutputSnapshot) {
     return Templates.PRINT_OUTPUT_TEMPLATE(printOutputSnapshot);
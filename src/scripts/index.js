@@ -1,3 +1,4 @@
+import * as Binary from './binary.js';
 import * as Constants from './constants.js';
 import * as Editor from './editor.js';
 import * as Overlay from './overlay.js';
@@ -71,6 +72,7 @@ Slider.initializeSlider(
     Constants.SLIDER_R_BUTTON,
     true,
     drawSnapshot,
+    Pyagram.prefetchSnapshots,
 );
 
 Object.keys(visOptions).forEach(function(visOptionID) {
@@ -99,20 +101,15 @@ Constants.DRAW_PYAGRAM_BUTTON.onclick = function() {
         var drawPyagramButtonText = Constants.DRAW_PYAGRAM_BUTTON.innerHTML;
         Constants.DRAW_PYAGRAM_BUTTON.onclick = function() {};
         Constants.DRAW_PYAGRAM_BUTTON.innerHTML = Constants.DRAW_PYAGRAM_BUTTON_WAIT_TEXT;
-        $.ajax({
-            type: 'GET',
-            url: '/draw',
-            data: {
-                'code': code,
-            },
-            contentType: 'application/json',
-            dataType: 'json',
-            success: function(pyagram) {
-                Pyagram.drawPyagram(Constants.SLIDER, pyagram);
-                Overlay.setBottom(Constants.OUTPUT_OVERLAY);
-                Constants.DRAW_PYAGRAM_BUTTON.onclick = drawPyagramButtonEffect;
-                Constants.DRAW_PYAGRAM_BUTTON.innerHTML = drawPyagramButtonText;
-            },
+        Binary.request('/draw', {
+            'code': code,
+            'delta': true,
+            'paginate': true,
+        }).then(function(pyagram) {
+            Pyagram.drawPyagramSession(Constants.SLIDER, pyagram);
+            Overlay.setBottom(Constants.OUTPUT_OVERLAY);
+            Constants.DRAW_PYAGRAM_BUTTON.onclick = drawPyagramButtonEffect;
+            Constants.DRAW_PYAGRAM_BUTTON.innerHTML = drawPyagramButtonText;
         });
     }
 };
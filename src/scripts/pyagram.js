@@ -1,3 +1,4 @@
+import * as Binary from './binary.js';
 import * as Constants from './constants.js';
 import * as Decode from './decode.js';
 import * as Slider from './slider.js';
@@ -5,23 +6,35 @@ import * as Switch from './switch.js';
 
 var encoding;
 var snapshots;
+var snapshotDeltas;
 var globalData;
 var pgErrorInfo;
+var session;
+var currSnapshotIndex;
 
 export function drawPyagram(slider, pyagram) {
     encoding = pyagram.encoding;
     switch (pyagram.encoding) {
         case 'result':
-            snapshots = pyagram.data.snapshots;
+            if (pyagram.data.delta) {
+                snapshots = pyagram.data.snapshots.slice(0, 1);
+                snapshotDeltas = pyagram.data.snapshots;
+            } else {
+                snapshots = pyagram.data.snapshots;
+                snapshotDeltas = undefined;
+            }
             globalData = pyagram.data.global_data;
             pgErrorInfo = undefined;
+            session = undefined;
             slider.min = 0;
-            slider.max = snapshots.length - 1;
+            slider.max = pyagram.data.snapshots.length - 1;
             break;
         case 'error':
             snapshots = undefined;
+            snapshotDeltas = undefined;
             globalData = undefined;
             pgErrorInfo = pyagram.data;
+            session = undefined;
             slider.min = 0;
             slider.max = 0;
             break;
@@ -29,13 +42,100 @@ export function drawPyagram(slider, pyagram) {
     Slider.reset(slider);
 }
 
+export function drawPyagramSession(slider, pyagram) {
+    // Draw a pyagram from /draw?paginate=true, which only includes the first page of snapshots. The
+    // other pages are fetched from /snapshots as the slider gets near them.
+    if (pyagram.encoding === 'result') {
+        encoding = 'result';
+        snapshots = undefined;
+        snapshotDeltas = undefined;
+        globalData = pyagram.data.global_data;
+        pgErrorInfo = undefined;
+        session = {
+            'id': pyagram.data.session_id,
+            'pageSize': pyagram.data.page_size,
+            'numSnapshots': pyagram.data.num_snapshots,
+            'delta': pyagram.data.delta,
+            'pages': {0: decodePage(pyagram.data.snapshots, pyagram.data.delta)},
+            'requests': {},
+        };
+        slider.min = 0;
+        slider.max = session.numSnapshots - 1;
+        Slider.reset(slider);
+    } else {
+        drawPyagram(slider, pyagram);
+    }
+}
+
+export function prefetchSnapshots(snapshotIndex) {
+    // Fetch the page the slider is on, along with the pages on either side of it.
+    if (session !== undefined) {
+        var pageIndex = Math.floor(snapshotIndex / session.pageSize);
+        var numPages = Math.ceil(session.numSnapshots / session.pageSize);
+        [pageIndex, pageIndex - 1, pageIndex + 1].forEach(function(neighborIndex) {
+            if (0 <= neighborIndex && neighborIndex < numPages && !(neighborIndex in session.pages)) {
+                loadPage(neighborIndex);
+            }
+        });
+    }
+}
+
+function loadPage(pageIndex) {
+    var currSession = session;
+    if (!(pageIndex in currSession.requests)) {
+        var start = pageIndex * currSession.pageSize;
+        currSession.requests[pageIndex] = Binary.request('/snapshots', {
+            'session_id': currSession.id,
+            'start': start,
+            'stop': start + currSession.pageSize,
+            'delta': currSession.delta,
+        }).then(function(page) {
+            currSession.pages[pageIndex] = decodePage(page.snapshots, currSession.delta);
+        }, function(response) {
+            // If the session expired, show the error that came back instead. Otherwise, let the page
+            // get requested again the next time it is needed.
+            delete currSession.requests[pageIndex];
+            if (currSession === session && response.responseJSON !== undefined) {
+                encoding = 'error';
+                pgErrorInfo = response.responseJSON.data;
+                session = undefined;
+            } else {
+                throw response;
+            }
+        });
+    }
+    return currSession.requests[pageIndex];
+}
+
+function decodePage(pageSnapshots, isDelta) {
+    if (!isDelta) {
+        return pageSnapshots;
+    }
+    var page = pageSnapshots.slice(0, 1);
+    for (var i = 1; i < pageSnapshots.length; i++) {
+        page.push(Decode.decodeSnapshotDelta(page[i - 1], pageSnapshots[i]));
+    }
+    return page;
+}
+
 export function drawSnapshot(snapshotIndex, visOptions, pyagramStack, pyagramHeap) {
+    currSnapshotIndex = snapshotIndex;
     switch (encoding) {
         case undefined:
             break;
         case 'result':
             Switch.select(Constants.PYAGRAM_DATA_SWITCH, Constants.PG_DATA_RESULT_VIEW_ID);
-            var snapshot = snapshots[snapshotIndex];
+            var snapshot = getSnapshot(snapshotIndex);
+            if (snapshot === undefined) {
+                // The snapshot is on a page that has not arrived yet. Draw it once it does, unless the
+                // slider has moved on by then.
+                loadPage(Math.floor(snapshotIndex / session.pageSize)).then(function() {
+                    if (currSnapshotIndex === snapshotIndex) {
+                        drawSnapshot(snapshotIndex, visOptions, pyagramStack, pyagramHeap);
+                    }
+                });
+                break;
+            }
             var pyagramHTML = Decode.decodeSnapshot(
                 snapshot,
                 globalData,
@@ -56,6 +156,21 @@ export function drawSnapshot(snapshotIndex, visOptions, pyagramStack, pyagramHea
     }
 }
 
+function getSnapshot(snapshotIndex) {
+    if (session !== undefined) {
+        var page = session.pages[Math.floor(snapshotIndex / session.pageSize)];
+        return page === undefined ? undefined : page[snapshotIndex % session.pageSize];
+    }
+    // With delta encoding, each snapshot is rebuilt from the one before it the first time it is drawn.
+    while (snapshots.length <= snapshotIndex) {
+        snapshots.push(Decode.decodeSnapshotDelta(
+            snapshots[snapshots.length - 1],
+            snapshotDeltas[snapshots.length],
+        ));
+    }
+    return snapshots[snapshotIndex];
+}
+
 function drawSVGs(visOptions) {
     clearSVGCanvas();
     if (!visOptions.splitView.checked) {
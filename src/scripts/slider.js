@@ -1,7 +1,10 @@
-export function initializeSlider(slider, sliderLabel, sliderButtonL, sliderButtonR, shouldBindKeys, emitValue) {
+export function initializeSlider(slider, sliderLabel, sliderButtonL, sliderButtonR, shouldBindKeys, emitValue, prefetchValue) {
     slider.oninput = function() {
         emitValue(parseInt(slider.value));
         sliderLabel.innerHTML = slider.value;
+        if (prefetchValue !== undefined) {
+            prefetchValue(parseInt(slider.value));
+        }
     };
     sliderButtonL.onclick = function() {
         incrementSlider(slider, -1);
@@ -474,6 +474,14 @@ export const EXCEPTION_TEMPLATE = compile(`
 {{/unless}}
 `);
 
+export const TRUNCATION_TEMPLATE = compile(`
+{{#if this}}
+  <div class="px-3 py-2 pyagram-readout font-italic">
+    {{escape this}}
+  </div>
+{{/if}}
+`);
+
 export const PRINT_OUTPUT_TEMPLATE = compile(`
 <div class="pyagram-readout font-family-monospace">
   {{escape this}}
@@ -0,0 +1,43 @@
+import sys
+import unittest
+
+from src.packages.pyagram import binary_encoding
+
+class PackTest(unittest.TestCase):
+    """
+    """
+
+    def test_pack(self):
+        shared = [1, 'a']
+        self.assertEqual(
+            binary_encoding.pack([{'x': shared, 'y': None}, {'x': shared, 'y': -1.5}]),
+            bytes([
+                0x92,
+                0xd5, 0x02, 0x00, 0x00, 0x92, 0xa1, ord('x'), 0xa1, ord('y'),
+                0x92, 0x01, 0xa1, ord('a'),
+                0xc0,
+                0xd4, 0x01, 0x00,
+                0x92, 0x01, 0xa1, ord('a'),
+                0xcb, 0xbf, 0xf8, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
+            ]),
+        )
+
+    def test_deep_nesting(self):
+
+        # A pyagram of deeply recursive code nests its frames deeper than Python's recursion limit.
+
+        depth = 2 * sys.getrecursionlimit()
+        value = []
+        for _ in range(depth):
+            value = [{'frame': value}]
+        shape_definition = bytes([0xd5, 0x02, 0x00, 0x00, 0x91, 0xa5]) + b'frame'
+        shape_reference = bytes([0xd4, 0x01, 0x00])
+        self.assertEqual(
+            binary_encoding.pack(value),
+            bytes([0x91]) + shape_definition
+            + (bytes([0x91]) + shape_reference) * (depth - 1)
+            + bytes([0x90]),
+        )
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+import concurrent.futures
+import sys
+import unittest
+
+from src.packages.pyagram import budget
+from src.packages.pyagram import pyagram as pg
+from src.packages.pyagram import worker_pool
+
+TIMEOUT = 5 # In seconds.
+
+RUNAWAY_PROGRAMS = {
+    'infinite_loop': '''
+x = []
+while True:
+    x.append(x)
+''',
+    'deep_recursion': '''
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+fib(30)
+''',
+    'except_exception': '''
+n = 0
+while True:
+    try:
+        n = n + 1
+    except Exception:
+        pass
+''',
+}
+
+SWALLOWING_PROGRAM = '''
+n = 0
+while True:
+    try:
+        n = n + 1
+    except:
+        pass
+'''
+
+def draw(code):
+    """
+    """
+    serialization = pg.Pyagram(
+        code,
+        debug=False,
+        budget=budget.Budget(max_trace_events=300),
+    ).serialize()
+    if serialization['encoding'] == 'result':
+        return serialization['encoding'], serialization['data']['global_data']['truncated']
+    else:
+        return serialization['encoding'], None
+
+@unittest.skipIf((3, 10) <= sys.version_info, 'the preprocessor only supports Python 3.9 and earlier')
+class BudgetTest(unittest.TestCase):
+    """
+    """
+
+    # Every pyagram is drawn in a worker process, which gets killed if it runs for longer than
+    # TIMEOUT seconds. So a program that escapes its Budget fails the test instead of hanging it.
+
+    @classmethod
+    def setUpClass(cls):
+        cls.pool = worker_pool.WorkerPool(
+            draw,
+            num_workers=1,
+            max_queue=len(RUNAWAY_PROGRAMS) + 2,
+            max_jobs_per_worker=float('inf'),
+            max_rss_bytes=float('inf'),
+            timeout=TIMEOUT,
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.pool.shutdown()
+
+    def test_runaway_code_is_truncated(self):
+        for name, program in RUNAWAY_PROGRAMS.items():
+            with self.subTest(name):
+                encoding, truncated = self.pool.submit(program).result()
+                self.assertEqual(encoding, 'result')
+                self.assertTrue(truncated)
+
+    def test_swallowed_budget_is_killed(self):
+
+        # A bare `except:` catches the BudgetExceededException, and the rest of the program runs
+        # untraced. Only the worker's timeout can stop it, after which the pool carries on as usual.
+
+        with self.assertRaises(concurrent.futures.TimeoutError):
+            self.pool.submit(SWALLOWING_PROGRAM).result()
+        encoding, truncated = self.pool.submit(RUNAWAY_PROGRAMS['infinite_loop']).result()
+        self.assertEqual(encoding, 'result')
+        self.assertTrue(truncated)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import collections
+import io
+import unittest
+
+from src.packages.pyagram import pyagram_state
+
+Point = collections.namedtuple('Point', ['x', 'y'])
+
+class Pair(Point):
+    """
+    """
+
+class Bag(list):
+    """
+    """
+
+class ObjectRegistryTest(unittest.TestCase):
+    """
+    """
+
+    # User code that imports anything cannot be drawn yet, so these objects are built here and
+    # tracked and encoded directly, the way MemoryState.step and Encoder.encode_object would.
+
+    def encode_objects(self, *objects):
+        """
+        """
+        state = pyagram_state.State((1, {}), io.StringIO(), interrupt_data=None)
+        for object in objects:
+            state.memory_state.track(object)
+        state.memory_state.step()
+        return {
+            object_snapshot['id']: object_snapshot['object']
+            for object_snapshot in state.memory_state.snapshot()
+        }
+
+    def test_ordered_collections(self):
+        deque = collections.deque([1, 2])
+        point = Point(3, 4)
+        encodings = self.encode_objects(deque, point)
+        self.assertEqual(encodings[id(deque)], {
+            'encoding': 'ordered_collection',
+            'data': {'type': 'deque', 'elements': ['1', '2']},
+        })
+        self.assertEqual(encodings[id(point)], {
+            'encoding': 'ordered_collection',
+            'data': {'type': 'Point', 'elements': ['3', '4']},
+        })
+
+    def test_mappings(self):
+        ordered_dict = collections.OrderedDict([(1, 2), (3, 4)])
+        ordered_dict.move_to_end(1)
+        default_dict = collections.defaultdict(list)
+        default_dict[5].append(6)
+        encodings = self.encode_objects(ordered_dict, default_dict)
+        self.assertEqual(encodings[id(ordered_dict)]['encoding'], 'mapping')
+        self.assertEqual(
+            [item['key'] for item in encodings[id(ordered_dict)]['data']['items']],
+            ['3', '1'],
+        )
+        self.assertEqual(encodings[id(default_dict)]['encoding'], 'mapping')
+        self.assertEqual(encodings[id(default_dict)]['data']['items'], [{
+            'key': '5',
+            'value': id(default_dict[5]),
+        }])
+        self.assertEqual(encodings[id(default_dict[5])], {
+            'encoding': 'ordered_collection',
+            'data': {'type': 'list', 'elements': ['6']},
+        })
+
+    def test_subclasses_are_instances(self):
+
+        # Only namedtuples themselves are drawn as collections. Other subclasses of built-in types
+        # may override methods like __iter__, so they are drawn as instances.
+
+        pair = Pair(1, 2)
+        bag = Bag([3])
+        encodings = self.encode_objects(pair, bag)
+        self.assertEqual(encodings[id(pair)]['encoding'], 'instance')
+        self.assertEqual(encodings[id(bag)]['encoding'], 'instance')
+
+if __name__ == '__main__':
+    unittest.main()
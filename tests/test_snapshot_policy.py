@@ -0,0 +1,89 @@
+import json
+import re
+import sys
+import unittest
+
+from src.packages.pyagram import pyagram as pg
+from src.packages.pyagram import snapshot_policy
+
+PROGRAMS = {
+    'recursion': '''
+def fact(n):
+    if n == 0:
+        return 1
+    return n * fact(n - 1)
+x = fact(4)
+''',
+    'classes': '''
+class Counter:
+    total = 0
+    def __init__(self, start):
+        self.count = start
+    def increment(self):
+        self.count = self.count + 1
+        Counter.total = Counter.total + 1
+c = Counter(3)
+c.increment()
+''',
+    'generators': '''
+def countdown(n):
+    while 0 < n:
+        yield n
+        n = n - 1
+total = 0
+for x in countdown(3):
+    total = total + x
+squares = [x * x for x in range(3)]
+it = iter(squares)
+first = next(it)
+''',
+    'exceptions': '''
+def divide(x, y):
+    return x / y
+try:
+    divide(1, 0)
+except ZeroDivisionError as e:
+    print('caught', e)
+divide(2, 0)
+''',
+}
+
+def draw(code, policy):
+    """
+    """
+
+    # Object IDs differ from one run to the next, so each is replaced by the number it is drawn
+    # with.
+
+    serialization = pg.Pyagram(code, debug=False, snapshot_policy=policy).serialize()
+    assert serialization['encoding'] == 'result'
+    data = serialization['data']
+    obj_numbers = {
+        str(object_id): obj_number
+        for object_id, obj_number in data['global_data'].pop('obj_numbers').items()
+    }
+    return re.sub(
+        r'\d+',
+        lambda match: f'#{obj_numbers[match.group()]}' if match.group() in obj_numbers else match.group(),
+        json.dumps(data, sort_keys=True),
+    )
+
+@unittest.skipIf((3, 10) <= sys.version_info, 'the preprocessor only supports Python 3.9 and earlier')
+class SnapshotPolicyTest(unittest.TestCase):
+    """
+    """
+
+    def test_visible_events_draw_every_event(self):
+
+        # VisibleEventPolicy skips the trace events that cannot change the diagram, so it must draw
+        # the same pyagram as EveryEventPolicy, which takes a snapshot upon every one of them.
+
+        for name, program in PROGRAMS.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    draw(program, snapshot_policy.VisibleEventPolicy()),
+                    draw(program, snapshot_policy.EveryEventPolicy()),
+                )
+
+if __name__ == '__main__':
+    unittest.main()
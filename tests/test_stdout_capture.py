@@ -0,0 +1,86 @@
+import concurrent.futures
+import io
+import sys
+import threading
+import unittest
+
+from src.packages.pyagram import pyagram as pg
+from src.packages.pyagram import stdout_capture
+
+NUM_THREADS = 16
+NUM_JOBS = 64
+
+PROGRAM = '''
+def count(name, n):
+    for i in range(n):
+        print(name, i)
+count({name!r}, 5)
+print({name!r}, 'done', end='!')
+'''
+
+def get_print_output(name):
+    """
+    """
+    return ''.join(f'{name} {i}\n' for i in range(5)) + f'{name} done!'
+
+class CaptureStdoutTest(unittest.TestCase):
+    """
+    """
+
+    def test_concurrent_captures(self):
+
+        # Each thread captures its own print output, while the others are printing too.
+
+        barrier = threading.Barrier(NUM_THREADS)
+        def capture(name):
+            with stdout_capture.capture_stdout(io.StringIO()) as stream:
+                barrier.wait()
+                for i in range(200):
+                    print(name, i)
+                    sys.stdout.flush()
+            return stream.getvalue()
+        with concurrent.futures.ThreadPoolExecutor(NUM_THREADS) as executor:
+            names = [f'thread{i}' for i in range(NUM_THREADS)]
+            for name, print_output in zip(names, executor.map(capture, names)):
+                self.assertEqual(print_output, ''.join(f'{name} {i}\n' for i in range(200)))
+
+    def test_nested_captures(self):
+        with stdout_capture.capture_stdout(io.StringIO()) as outer_stream:
+            print('outer')
+            with stdout_capture.capture_stdout(io.StringIO()) as inner_stream:
+                print('inner')
+            print('outer again')
+        self.assertEqual(outer_stream.getvalue(), 'outer\nouter again\n')
+        self.assertEqual(inner_stream.getvalue(), 'inner\n')
+
+    def test_seek_and_truncate_are_refused(self):
+
+        # Snapshots store offsets into the captured stream, which seeking or truncating would break.
+
+        with stdout_capture.capture_stdout(io.StringIO()) as stream:
+            print('before')
+            self.assertFalse(sys.stdout.seekable())
+            with self.assertRaises(io.UnsupportedOperation):
+                sys.stdout.seek(0)
+            with self.assertRaises(io.UnsupportedOperation):
+                sys.stdout.truncate(0)
+            print('after')
+            self.assertEqual(sys.stdout.tell(), len('before\nafter\n'))
+        self.assertEqual(stream.getvalue(), 'before\nafter\n')
+
+    @unittest.skipIf((3, 10) <= sys.version_info, 'the preprocessor only supports Python 3.9 and earlier')
+    def test_concurrent_pyagrams(self):
+
+        # Pyagrams drawn at the same time in one process never mix up their print output.
+
+        def draw(name):
+            serialization = pg.Pyagram(PROGRAM.format(name=name), debug=False).serialize()
+            self.assertEqual(serialization['encoding'], 'result')
+            return serialization['data']['global_data']['print_output']
+        with concurrent.futures.ThreadPoolExecutor(NUM_THREADS) as executor:
+            names = [f'job{i}' for i in range(NUM_JOBS)]
+            for name, print_output in zip(names, executor.map(draw, names)):
+                self.assertEqual(print_output, get_print_output(name))
+
+if __name__ == '__main__':
+    unittest.main()